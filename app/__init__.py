@@ -10,10 +10,7 @@ from typing import Optional
 
 from flask import Flask
 from flask_admin.menu import MenuLink
-from flask_security import (
-    SQLAlchemyUserDatastore,
-    current_user,
-)
+from flask_security import current_user
 from redis import Redis
 
 from .core.localization import (
@@ -29,7 +26,8 @@ from .core.tasks import celery_init_app
 
 def create_app(
         session_redis: Optional[Redis] = None,
-        use_celery: bool = False
+        use_celery: bool = False,
+        acl_redis: Optional[Redis] = None,
     ) -> Flask:
     """Flask app factory."""
 
@@ -75,12 +73,17 @@ def create_app(
     babel.init_app(app)
 
     # Setup Security extension.
+    from .auth.datastore import ACLUserDatastore
     from .auth.models import Role, User
     from .extensions import security
 
-    datastore = SQLAlchemyUserDatastore(db, User, Role)
+    datastore = ACLUserDatastore(db, User, Role)
     security.init_app(app, datastore)
 
+    # Setup shared ACL cache.
+    from .auth.shared_cache import shared_cache
+    shared_cache.init_app(app, acl_redis)
+
     # Setup Admin extension.
     from .extensions import admin
     
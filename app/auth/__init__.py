@@ -3,7 +3,7 @@ from sqlalchemy import event
 
 
 def create_blueprint() -> Blueprint:
-    from . import admin, middleware, models, views
+    from . import admin, commands, middleware, models, views
 
     blueprint = Blueprint(
         'auth',
@@ -22,6 +22,13 @@ def create_blueprint() -> Blueprint:
         admin.GroupAccessesAdmin,
     )
     
+    blueprint.cli.add_command(commands.rebuild_permissions)
+    blueprint.cli.add_command(commands.check_permissions)
+    blueprint.cli.add_command(commands.permission_matrix)
+
+    blueprint.before_app_request(middleware.pin_acl_version)
+    blueprint.teardown_app_request(middleware.clear_acl_cache)
+
     blueprint.add_url_rule('/', view_func=views.index)
     blueprint.add_url_rule('/task/sleep/', view_func=views.start_task)
     blueprint.add_url_rule('/task/<id>/', view_func=views.get_task)
@@ -70,6 +77,11 @@ def prepare_blueprint():
                 model.__table__.name, model.__table__.schema) for model in models):
             return None
         
+        if AccessNode.query.filter(AccessNode.path.is_(None)).count() > 0:
+            AccessNode.rebuild_paths()
+
+        Role.rebuild_permission_masks()
+
         if (auth_access := AccessNode.get_by_full_name('auth')) is None:
             auth_access = AccessNode.create_by_full_name('auth')
 
@@ -1,12 +1,18 @@
+from functools import wraps
 from typing import (
-    Any,
-    Tuple,
+    Callable,
+    Optional,
 )
+from time import perf_counter
 import uuid
 
 from flask import (
+    Response,
     flash,
+    g,
+    redirect,
     request,
+    stream_with_context,
 )
 from flask_admin.actions import action
 from flask_admin.babel import (
@@ -14,6 +20,9 @@ from flask_admin.babel import (
     ngettext,
 )
 from flask_admin.base import expose
+from flask_admin.contrib.sqla.fields import QuerySelectField
+from flask_admin.form import BaseForm
+from flask_admin.helpers import get_redirect_target
 from flask_admin.model.form import InlineFormAdmin
 from flask_security import (
     current_user,
@@ -21,7 +30,13 @@ from flask_security import (
     verify_password,
 )
 from flask_security import current_user
+from sqlalchemy import (
+    distinct,
+    func,
+    literal,
+)
 from sqlalchemy.orm import Query
+from werkzeug.utils import secure_filename
 from wtforms import (
     BooleanField,
     PasswordField,
@@ -35,9 +50,20 @@ from ..core.admin import (
     AdminModelView,
     Select2MultipleField,
 )
-from ..core.auth import is_current_user_super
-from ..core.database import DbModel
+from ..core.auth import (
+    current_user_id,
+    is_current_user_super,
+)
+from ..core.database import (
+    DbModel,
+    estimate_row_count,
+)
 from ..core.utils import exclude
+from . import (
+    cache as acl_cache,
+    report,
+    simulator,
+)
 from .constants import (
     Permission,
     CONTRIBUTOR,
@@ -53,6 +79,32 @@ from .models import (
 )
 
 
+_EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+}
+
+
+def _cached_permission(func: Callable[..., bool]) -> Callable[..., bool]:
+    """Caches the result of an admin permission check for the rest of the
+    request, keyed by view, check, item and current user.
+    """
+
+    @wraps(func)
+    def wrapper(self, item: DbModel | None = None) -> bool:
+        item_id = getattr(item, 'id', None)
+
+        if item is not None and item_id is None:
+            return func(self, item)
+
+        key = ('admin', self.endpoint, func.__name__, item_id,
+                current_user_id())
+        
+        return acl_cache.cached(key, lambda: func(self, item) \
+                if item is not None else func(self))
+
+    return wrapper
+
 def _group_query() -> Query:
     return Group.query.filter(
         (Group.name != 'Anonymous')
@@ -67,26 +119,163 @@ class AdminAccessModelView(AdminModelView):
         'use_unique_access': BooleanField('Use Unique Access?'),
     }
 
+    list_template = 'admin/model/access_list.html'
+
+    count_estimate_threshold: Optional[int] = None
+    """Above this many rows according to the table statistics, the list view
+    shows the estimate to users that see every record instead of counting
+    them, unless an exact count is asked for. Disabled when None."""
+
+    export_types = list(_EXPORT_MIMETYPES)
+
+    export_chunk_size = 1000
+    """Records read from the server-side cursor and encoded at a time when
+    streaming an export."""
+
+    def get_item_eager_loads(self):
+        loads = super().get_item_eager_loads()
+
+        # The permission checks and the access node field read it.
+        if issubclass(self.model, GranularAccessMixin) \
+                and 'access_node' not in loads:
+            loads = ('access_node', *loads)
+        
+        return loads
+
+    def get_authorized_filter(self):
+        """Returns the ACL criterion of the records listed to the current
+        user, or None when they see every record. Resolved once per request.
+        """
+
+        def resolve():
+            if issubclass(self.model, GranularAccessMixin):
+                return self.model.authorized_filter()
+            
+            return None if is_current_user_super() else \
+                    (self.model.id == 0) & (self.model.id != 0)
+        
+        return acl_cache.cached(('admin_filter', self.endpoint,
+                current_user_id()), resolve)
+
     def get_query(self):
-        if issubclass(self.model, GranularAccessMixin):
-            return self.model.authorized_query()
-        else:
-            query = super().get_query()
-            return query if is_current_user_super() else \
-                query.filter((self.model.id == 0) & (self.model.id != 0))
+        query = super().get_query()
+        criterion = self.get_authorized_filter()
+
+        return query if criterion is None else query.filter(criterion)
         
     def get_count_query(self):
-        count_query = self.get_query()
-        count_query.scalar = lambda: self.get_query().count()
+        criterion = self.get_authorized_filter()
+
+        if criterion is None and (estimate := self._estimated_count()):
+            g.admin_count_estimated = True
+            return self.session.query(literal(estimate))
 
-        return count_query
+        # Searches and filters may join to-many relationships.
+        count_query = self.session.query(func.count(distinct(self.model.id)))\
+                .select_from(self.model)
+        
+        return count_query if criterion is None \
+                else count_query.filter(criterion)
+    
+    def _estimated_count(self) -> Optional[int]:
+        if self.count_estimate_threshold is None \
+                or request.args.get('exact_count'):
+            return None
+        
+        # The statistics know nothing of searches and filters.
+        view_args = self._get_list_extra_args()
+
+        if view_args.search or view_args.filters:
+            return None
+        
+        estimate = estimate_row_count(self.session, self.model.__table__)
+
+        return estimate if estimate is not None \
+                and estimate > self.count_estimate_threshold else None
+    
+    def is_count_estimated(self) -> bool:
+        return g.get('admin_count_estimated', False)
+    
+    def get_exact_count_url(self) -> str:
+        return self.get_url('.index_view', exact_count=1,
+                **request.args.to_dict())
+    
+    def get_export_query(self) -> Query:
+        """Returns the query of the records the current user may read,
+        searched, filtered and sorted as in the list view, and read through
+        a server-side cursor export_chunk_size records at a time.
+        """
+
+        view_args = self._get_list_extra_args()
+        sort_column = self._get_column_by_idx(view_args.sort)
+        query, joins = self.get_query(), {}
+
+        if self._search_supported and view_args.search:
+            query, _, joins, _ = self._apply_search(query, None, joins, {},
+                    view_args.search)
+        
+        if view_args.filters and self._filters:
+            query, _, joins, _ = self._apply_filters(query, None, joins, {},
+                    view_args.filters)
+        
+        query, joins = self._apply_sorting(query, joins,
+                None if sort_column is None else sort_column[0],
+                view_args.sort_desc)
+        
+        if self.export_max_rows:
+            query = query.limit(self.export_max_rows)
+        
+        # Relationships in list_eager_loads should be to one record, joined
+        # into the rows of the cursor: MySQL can't run the queries loading
+        # collections on the connection while the cursor is open.
+        return query.yield_per(self.export_chunk_size)
+    
+    @expose('/export/<export_type>/')
+    def export(self, export_type):
+        """Streams the records of get_export_query as CSV or JSON, encoded
+        as they are read, so that memory use doesn't grow with the number of
+        records.
+        """
+
+        return_url = get_redirect_target() or self.get_url('.index_view')
+
+        if not self.can_export or export_type not in self.export_types \
+                or export_type not in _EXPORT_MIMETYPES:
+            flash(gettext('Permission denied.'), 'error')
+            return redirect(return_url)
+        
+        query = self.get_export_query()
+        names = [name for name, title in self._export_columns]
+        
+        # The query is executed once streaming starts, since saving the
+        # session may commit and release the current connection.
+        def generate():
+            if export_type == 'csv':
+                rows = ([self.get_export_value(record, name)
+                        for name in names] for record in query)
+                yield from report.iter_csv(rows,
+                        [title for name, title in self._export_columns],
+                        self.export_chunk_size)
+            else:
+                rows = ({name: self.get_export_value(record, name)
+                        for name in names} for record in query)
+                yield from report.iter_json(rows, self.export_chunk_size)
+        
+        filename = secure_filename(self.get_export_name(export_type))
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype=_EXPORT_MIMETYPES[export_type],
+            headers={'Content-Disposition':
+                    f"attachment; filename={filename}"},
+        )
     
     def on_form_prefill(self, form, id):
         if not (issubclass(self.model, GranularAccessMixin)
                 and getattr(form, 'use_unique_access', False)):
             return None
         
-        item = self.model.query.get(id)
+        item = self.get_one(id)
         form.use_unique_access.data = item.has_unique_access
 
     def on_model_change(self, form, model, is_created):
@@ -98,134 +287,95 @@ class AdminAccessModelView(AdminModelView):
             
             if model.use_unique_access:
                 model.access_node = AccessNode.create_by_full_name(
-                    f"{model_pn.full_name}.{model.uuid}",
-                    user_accesses=item_pn.user_accesses,
-                    group_accesses=item_pn.group_accesses,
-                )
+                        f"{model_pn.full_name}.{model.uuid}")
+                self.session.flush()
+                model.access_node.copy_grants_from(item_pn)
             else:
-                self.session.delete(item_pn)
                 model.access_node = model_pn
+                self.session.flush()
+                item_pn.delete_subtree()
 
-    def has_create_permission(self) -> bool:
-        if is_current_user_super():
-            return True
+    def _has_record_permission(self, permission: Permission,
+            item: DbModel | None = None) -> bool:
         
-        access: AccessNode = self.model.get_model_access_node() \
-                if hasattr(self.model, 'get_model_access_node') else None
-
-        return access != None and access.has_user_permissions(
-                current_user, Permission.CREATE_RECORD)
-    
-    def has_details_permission(self, item: DbModel | None = None) -> bool:
         if is_current_user_super():
             return True
         
         if item is None:
-            access: AccessNode = self.model.get_model_access_node() \
-                    if hasattr(self.model, 'get_model_access_node') else None
+            access_id = self.model.get_model_access_node_id() \
+                    if hasattr(self.model, 'get_model_access_node_id') \
+                    else None
         else:
-            access: AccessNode = getattr(item, 'access_node', None)
+            access_id = getattr(item, 'access_node_id', None)
 
-        return access != None and access.has_user_permissions(current_user,
-                Permission.READ_RECORD)
+        return access_id is not None and access_id in AccessNode\
+                .permitted_ids([access_id], current_user, permission)
     
-    def has_edit_permission(self, item: DbModel | None = None) -> bool:
-        if is_current_user_super():
-            return True
+    def get_editable_filter(self):
+        def resolve():
+            if issubclass(self.model, GranularAccessMixin):
+                return self.model.authorized_filter(Permission.EDIT_RECORD)
+            
+            return None if is_current_user_super() else \
+                    (self.model.id == 0) & (self.model.id != 0)
         
-        if item is None:
-            access: AccessNode = self.model.get_model_access_node() \
-                    if hasattr(self.model, 'get_model_access_node') else None
-        else:
-            access: AccessNode = getattr(item, 'access_node', None)
+        return acl_cache.cached(('admin_edit_filter', self.endpoint,
+                current_user_id()), resolve)
 
-        return access != None and access.has_user_permissions(current_user,
-                Permission.EDIT_RECORD)
+    @_cached_permission
+    def has_create_permission(self) -> bool:
+        return self._has_record_permission(Permission.CREATE_RECORD)
+    
+    @_cached_permission
+    def has_details_permission(self, item: DbModel | None = None) -> bool:
+        return self._has_record_permission(Permission.READ_RECORD, item)
+    
+    @_cached_permission
+    def has_edit_permission(self, item: DbModel | None = None) -> bool:
+        return self._has_record_permission(Permission.EDIT_RECORD, item)
     
+    @_cached_permission
     def has_delete_permission(self, item: DbModel | None = None) -> bool:
-        if is_current_user_super():
-            return True
+        return self._has_record_permission(Permission.DELETE_RECORD, item)
+    
+    def _limit_access_nodes(self, form, item: DbModel | None = None):
+        """Limits the access node choices of form to the chain of the item,
+        or of the model, when the user may assign access. The choices are
+        set on the form instance, so the form class is scaffolded once.
+        """
+
+        if not (issubclass(self.model, GranularAccessMixin)
+                and hasattr(form, 'access_node')):
+            return form
+        
+        model_access = self.model.get_model_access_node()
+
+        if model_access is None or not model_access.has_user_permissions(
+                current_user, Permission.ASSIGN_ACCESS):
+            return form
         
         if item is None:
-            access: AccessNode = self.model.get_model_access_node() \
-                    if hasattr(self.model, 'get_model_access_node') else None
+            form.access_node.query = model_access.ancestors(include_self=True)
+        elif item.access_node:
+            form.access_node.query = item.access_node\
+                    .ancestors(include_self=True)
         else:
-            access: AccessNode = getattr(item, 'access_node', None)
-
-        return access != None and access.has_user_permissions(current_user,
-                Permission.DELETE_RECORD)
+            form.access_node.query = [model_access]
+        
+        return form
     
-    @expose('/new/', methods=('GET', 'POST'))
-    def create_view(self):
-        if issubclass(self.model, GranularAccessMixin):
-            model_access = self.model.get_model_access_node()
-
-            if model_access is None or not model_access.has_user_permissions(
-                    current_user, Permission.ASSIGN_ACCESS):
-                return super().create_view()
-            
-            access_ids = []
-            access = model_access
-
-            while access:
-                access_ids.append(access.id)
-                access = access.parent
-            
-            form_args_update = {
-                'access_node': {
-                    'query_factory': lambda: AccessNode.query\
-                            .filter(AccessNode.id.in_(access_ids))\
-                            .order_by(AccessNode.id.desc()),
-                }
-            }
-
-            if self.form_args is None:
-                self.form_args = form_args_update
-            else:
-                self.form_args.update(form_args_update)
-
-            self._refresh_forms_cache()
-
-        return super().create_view()
+    def create_form(self, obj=None):
+        return self._limit_access_nodes(super().create_form(obj))
+    
+    def edit_form(self, obj=None):
+        return self._limit_access_nodes(super().edit_form(obj), obj)
     
-    @expose('/edit/', methods=('GET', 'POST'))
-    def edit_view(self):
-        if issubclass(self.model, GranularAccessMixin):
-            model_access = self.model.get_model_access_node()
-            item_id = int(request.args.get('id', None))
-            item = self.model.query.get(item_id)
-
-            if model_access is None or not model_access.has_user_permissions(
-                    current_user, Permission.ASSIGN_ACCESS) or item is None:
-                return super().edit_view()
-            
-            access_ids = []
-            access = item.access_node
-
-            while access:
-                access_ids.append(access.id)
-                access = access.parent
 
-            if not access_ids:
-                access_ids = [model_access.id] if model_access else [-1]
-            
-            form_args_update = {
-                'access_node': {
-                    'query_factory': lambda: AccessNode.query\
-                            .filter(AccessNode.id.in_(access_ids))\
-                            .order_by(AccessNode.id.desc()),
-                }
-            }
-
-            if self.form_args is None:
-                self.form_args = form_args_update
-            else:
-                self.form_args.update(form_args_update)
+class MoveAccessNodesForm(BaseForm):
 
-            self._refresh_forms_cache()
+    parent = QuerySelectField('New Parent', allow_blank=True,
+            blank_text='(No Parent)')
 
-        return super().edit_view()
-    
 
 class AccessNodesAdmin(AdminAccessModelView):
 
@@ -242,8 +392,10 @@ class AccessNodesAdmin(AdminAccessModelView):
         UserAccessInlineModel(UserAccess),
     )
     column_list = ('full_name', 'created_at', 'updated_at',)
-    column_filters = ('name', 'created_at', 'updated_at',)
-    column_searchable_list = ('name',)
+    column_sortable_list = column_list
+    column_default_sort = 'full_name'
+    column_filters = ('name', 'full_name', 'created_at', 'updated_at',)
+    column_searchable_list = ('name', 'full_name',)
     form_columns = (
         'uuid',
         'created_at',
@@ -254,50 +406,162 @@ class AccessNodesAdmin(AdminAccessModelView):
         'group_accesses',
     )
     column_details_list = form_columns
+    details_eager_loads = (
+        'parent',
+        'user_accesses.user',
+        'user_accesses.role',
+        'group_accesses.group',
+        'group_accesses.role',
+    )
     form_create_rules = ('parent', 'name', 'user_accesses', 'group_accesses',)
     form_edit_rules = form_create_rules
 
-    def get_query(self):
-        return self.session.query(self.model)
+    def get_authorized_filter(self):
+        return None
     
+    @action('move', 'Move', None)
+    def action_move(self, ids):
+        return redirect(self.get_url('.move_view', ids=','.join(ids),
+                url=self.get_url('.index_view')))
+    
+    @expose('/move/', methods=('GET', 'POST'))
+    def move_view(self):
+        return_url = get_redirect_target() or self.get_url('.index_view')
+        ids = [int(node_id) for node_id in
+                request.args.get('ids', '').split(',') if node_id.isdigit()]
+        nodes = []
+
+        # Nodes under another selected node move along with it.
+        for node in AccessNode.query.filter(AccessNode.id.in_(ids))\
+                .order_by(AccessNode.path):
+            if self.has_edit_permission(node) and not any(
+                    node.full_name.startswith(other.full_name + '.')
+                    for other in nodes):
+                nodes.append(node)
+
+        if not nodes:
+            flash(gettext('User has no permission to move these records.'),
+                    'error')
+            return redirect(return_url)
+        
+        excluded_ids = [node_id for node in nodes
+                for node_id in node.subtree_ids()]
+        form = MoveAccessNodesForm(request.form)
+        form.parent.query_factory = lambda: AccessNode.query\
+                .filter(AccessNode.id.not_in(excluded_ids))\
+                .order_by(AccessNode.path)
+        
+        if request.method == 'POST' and form.validate():
+            parent = form.parent.data
+
+            if parent is not None and not self.has_edit_permission(parent):
+                flash(gettext('User has no permission to edit this record.'),
+                        'error')
+            else:
+                try:
+                    for node in nodes:
+                        node.move_subtree(parent)
+
+                    self.session.commit()
+                    count = len(nodes)
+
+                    flash(
+                        ngettext(
+                            'Record was successfully moved.',
+                            f"{count} records were successfully moved.",
+                            count,
+                            count=count,
+                        ),
+                        'success',
+                    )
+                    return redirect(return_url)
+                except ValueError as ex:
+                    self.session.rollback()
+                    flash(gettext('Failed to move records. %(error)s',
+                            error=str(ex)), 'error')
+                
+        return self.render('admin/access_nodes/move.html', form=form,
+                nodes=nodes, return_url=return_url)
+    
+    @action('export_permissions', 'Export Permission Matrix', None)
+    def action_export_permissions(self, ids):
+        return redirect(self.get_url('.permission_matrix_view',
+                ids=','.join(ids)))
+    
+    @expose('/permission-matrix/')
+    def permission_matrix_view(self):
+        """Streams the effective permissions of every user on the access
+        nodes given by the `ids` argument, or on all of them, as CSV.
+        """
+
+        if not is_current_user_super():
+            flash(gettext('User has no permission to view this record.'),
+                    'error')
+            return redirect(self.get_url('.index_view'))
+        
+        node_ids = [int(node_id) for node_id in
+                request.args.get('ids', '').split(',') if node_id.isdigit()]
+        # The connection is taken once streaming starts, since saving the
+        # session may commit and release the current one.
+        def generate():
+            rows = report.permission_matrix(self.session.connection(),
+                    node_ids or None)
+            yield from report.iter_csv(rows, report.matrix_columns())
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/csv',
+            headers={'Content-Disposition':
+                    'attachment; filename=permission-matrix.csv'},
+        )
+    
+    def edit_form(self, obj: AccessNode | None = None):
+        form = super().edit_form(obj)
+
+        # A node cannot be moved under itself or one of its descendants.
+        if obj is not None and obj.id is not None and hasattr(form, 'parent'):
+            form.parent.query = AccessNode.query\
+                    .filter(AccessNode.id.not_in(obj.subtree_ids()))\
+                    .order_by(AccessNode.path)
+
+        return form
+    
+    @_cached_permission
     def has_create_permission(self) -> bool:
         if is_current_user_super():
             return True
         
-        model_access: AccessNode = self.model.get_model_access_node()
-
-        return model_access.has_user_permissions(
-                current_user, Permission.READ_RECORD)
+        return self._has_record_permission(Permission.READ_RECORD)
     
+    @_cached_permission
     def has_details_permission(self, item: DbModel | None = None) -> bool:
         if is_current_user_super():
             return True
 
-        model_access: AccessNode = self.model.get_model_access_node()
         access: AccessNode = item
 
         return access.has_user_permissions(current_user, Permission.READ_ACCESS) \
-                or model_access.has_user_permissions(current_user, Permission.READ_RECORD)
+                or self._has_record_permission(Permission.READ_RECORD)
     
+    @_cached_permission
     def has_edit_permission(self, item: DbModel | None = None) -> bool:
         if is_current_user_super():
             return True
 
-        model_access: AccessNode = self.model.get_model_access_node()
         access: AccessNode = item
 
         return access.has_user_permissions(current_user, Permission.EDIT_ACCESS) \
-                or model_access.has_user_permissions(current_user, Permission.EDIT_RECORD)
+                or self._has_record_permission(Permission.EDIT_RECORD)
     
+    @_cached_permission
     def has_delete_permission(self, item: DbModel | None = None) -> bool:
         if is_current_user_super():
             return True
 
-        model_access: AccessNode = self.model.get_model_access_node()
         access: AccessNode = item
 
         return access.has_user_permissions(current_user, Permission.DELETE_ACCESS) \
-                or model_access.has_user_permissions(current_user, Permission.DELETE_RECORD)
+                or self._has_record_permission(Permission.DELETE_RECORD)
     
 
 class RolesAdmin(AdminAccessModelView):
@@ -327,6 +591,7 @@ class RolesAdmin(AdminAccessModelView):
         'permissions',
     )
     column_details_list = form_columns
+    details_eager_loads = ('access_node',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -337,7 +602,38 @@ class RolesAdmin(AdminAccessModelView):
     form_edit_rules = form_create_rules
 
 
-class UsersAdmin(AdminAccessModelView):
+class AccessSimulatorMixin:
+    """Adds a view to model views of users or groups listing how many
+    records of each model the selected user or group has each permission
+    on.
+    """
+
+    @action('simulate_access', 'Simulate Access', None)
+    def action_simulate_access(self, ids):
+        return redirect(self.get_url('.simulate_access_view', id=ids[0]))
+    
+    @expose('/simulate-access/')
+    def simulate_access_view(self):
+        return_url = get_redirect_target() or self.get_url('.index_view')
+        item_id = request.args.get('id', '')
+        subject = self.session.get(self.model, int(item_id)) \
+                if item_id.isdigit() else None
+        
+        if subject is None or not is_current_user_super():
+            flash(gettext('User has no permission to view this record.'),
+                    'error')
+            return redirect(return_url)
+        
+        start = perf_counter()
+        counts = simulator.visible_counts(subject)
+        elapsed_ms = (perf_counter() - start) * 1000
+        
+        return self.render('admin/access_simulator.html', subject=subject,
+                counts=counts, permissions=Permission.names(),
+                elapsed_ms=elapsed_ms, return_url=return_url)
+
+
+class UsersAdmin(AccessSimulatorMixin, AdminAccessModelView):
 
     model = User
 
@@ -382,6 +678,7 @@ class UsersAdmin(AdminAccessModelView):
     )
     column_details_list = exclude(form_columns,
             ('old_password', 'new_password', 'confirm_password',))
+    details_eager_loads = ('access_node', 'groups',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -430,34 +727,11 @@ class UsersAdmin(AdminAccessModelView):
             )
             self.session.add(self_access)
 
-    def _activate_record(self, record, flag: bool = True) -> Tuple[Any, bool]:
-        has_permission = record.access_node.has_user_permissions(
-                current_user, Permission.EDIT_RECORD)
-
-        if has_permission:
-            record.active = flag
-            self.session.commit()
-
-        return record, has_permission
-    
     @action('enable', 'Enable', 'Are you sure you want to enable the selected pages?')
     def action_enable(self, ids):
         try:
-            updated_records = self.update_records(
-                ids,
-                lambda r: self._activate_record(r, True),
-            )
-            count = len(updated_records)
-
-            flash(
-                ngettext(
-                    'Record was successfully enabled.',
-                    f"{count} records were successfully enabled.",
-                    count,
-                    count=count,
-                ),
-                'success',
-            )
+            self.flash_update_outcomes(
+                    self.update_records(ids, {'active': True}), 'enabled')
         except Exception as ex:
             if not self.handle_view_exception(ex):
                 raise
@@ -467,21 +741,8 @@ class UsersAdmin(AdminAccessModelView):
     @action('disable', 'Disable', 'Are you sure you want to disable the selected pages?')
     def action_disable(self, ids):
         try:
-            updated_records = self.update_records(
-                ids,
-                lambda r: self._activate_record(r, False),
-            )
-            count = len(updated_records)
-
-            flash(
-                ngettext(
-                    'Record was successfully disabled.',
-                    f"{count} records were successfully disabled.",
-                    count,
-                    count=count,
-                ),
-                'success',
-            )
+            self.flash_update_outcomes(
+                    self.update_records(ids, {'active': False}), 'disabled')
         except Exception as ex:
             if not self.handle_view_exception(ex):
                 raise
@@ -489,7 +750,7 @@ class UsersAdmin(AdminAccessModelView):
             flash(gettext('Failed to disable records. %(error)s', error=str(ex)), 'error')
 
 
-class GroupsAdmin(AdminAccessModelView):
+class GroupsAdmin(AccessSimulatorMixin, AdminAccessModelView):
     """Admin view for model Group."""
 
     model = Group
@@ -511,6 +772,7 @@ class GroupsAdmin(AdminAccessModelView):
         'users',
     )
     column_details_list = form_columns
+    details_eager_loads = ('access_node', 'users',)
     form_create_rules = exclude(form_columns, ('uuid',
             'created_at', 'updated_at',))
     form_edit_rules = form_create_rules
@@ -538,6 +800,8 @@ class UserAccessesAdmin(AdminAccessModelView):
         'role',
     )
     column_details_list = form_columns
+    list_eager_loads = ('access', 'user', 'role',)
+    details_eager_loads = list_eager_loads
 
 
 class GroupAccessesAdmin(AdminAccessModelView):
@@ -561,3 +825,5 @@ class GroupAccessesAdmin(AdminAccessModelView):
         'role',
     )
     column_details_list = form_columns
+    list_eager_loads = ('access', 'group', 'role',)
+    details_eager_loads = list_eager_loads
@@ -0,0 +1,91 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+)
+
+from flask import (
+    g,
+    has_app_context,
+)
+
+
+_CACHE_ATTR = '_acl_cache'
+_STATS_ATTR = '_acl_cache_stats'
+
+
+def _get_store() -> Dict[Hashable, Any]:
+    return g.setdefault(_CACHE_ATTR, {})
+
+def _get_stats() -> Dict[str, int]:
+    return g.setdefault(_STATS_ATTR, {'hits': 0, 'misses': 0})
+
+def cached(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Returns the ACL decision stored under key for the current request,
+    calling compute and storing its result on a miss. Outside of an app
+    context, compute is called every time.
+    """
+
+    if not has_app_context():
+        return compute()
+
+    store = _get_store()
+    stats = _get_stats()
+
+    if key in store:
+        stats['hits'] += 1
+        return store[key]
+
+    stats['misses'] += 1
+    value = store[key] = compute()
+
+    return value
+
+def get(key: Hashable, default: Any = None) -> Any:
+    """Returns the ACL decision stored under key for the current request,
+    or default when there is none.
+    """
+
+    if not has_app_context():
+        return default
+    
+    store = _get_store()
+    stats = _get_stats()
+
+    if key in store:
+        stats['hits'] += 1
+        return store[key]
+    
+    stats['misses'] += 1
+
+    return default
+
+def put(key: Hashable, value: Any):
+    """Stores an ACL decision under key for the rest of the request."""
+
+    if has_app_context():
+        _get_store()[key] = value
+
+def clear():
+    """Drops every cached ACL decision of the current request. Hit and miss
+    counters are kept.
+    """
+
+    if has_app_context():
+        g.pop(_CACHE_ATTR, None)
+
+def stats() -> Dict[str, int]:
+    """Returns the hit and miss counters of the current request."""
+
+    if not has_app_context():
+        return {'hits': 0, 'misses': 0}
+
+    return dict(_get_stats())
+
+def reset():
+    """Drops cached ACL decisions together with their counters."""
+
+    if has_app_context():
+        g.pop(_CACHE_ATTR, None)
+        g.pop(_STATS_ATTR, None)
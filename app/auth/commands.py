@@ -0,0 +1,62 @@
+import click
+from flask.cli import with_appcontext
+
+from ..extensions import db
+from . import (
+    effective,
+    report,
+)
+
+
+@click.command('rebuild-permissions')
+@with_appcontext
+def rebuild_permissions():
+    """Rebuild the effective permission tables from the grants."""
+
+    try:
+        user_rows, group_rows = effective.rebuild(db.session.connection())
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    click.echo(f"Rebuilt {user_rows} user and {group_rows} group effective"
+            + " permission rows.")
+
+@click.command('check-permissions')
+@click.option('--fix', is_flag=True,
+        help='Rebuild the tables when they are inconsistent.')
+@with_appcontext
+def check_permissions(fix: bool):
+    """Compare the effective permission tables with the grants."""
+
+    result = effective.check(db.session.connection())
+
+    for name, rows in result.items():
+        click.echo(f"{name}: {len(rows)}")
+
+        for subject_id, node_id, mask in sorted(rows)[:20]:
+            click.echo(f"  subject={subject_id} access_node={node_id}"
+                    + f" permissions={mask}")
+
+    if not any(result.values()):
+        click.echo('Effective permissions are consistent.')
+    elif fix:
+        db.session.rollback()
+        rebuild_permissions.callback()
+    else:
+        raise SystemExit(1)
+
+@click.command('permission-matrix')
+@click.option('--output', type=click.File('w'), default='-',
+        help='CSV file to write to, stdout by default.')
+@with_appcontext
+def permission_matrix(output):
+    """Export the effective permissions of every user on every access node
+    as CSV.
+    """
+
+    rows = report.permission_matrix(db.session.connection())
+
+    for chunk in report.iter_csv(rows, report.matrix_columns()):
+        output.write(chunk)
@@ -1,6 +1,8 @@
 from typing import (
     Iterable,
+    List,
     Tuple,
+    Union,
 )
 from enum import Enum
 
@@ -18,6 +20,12 @@ READER = 'Reader'
 
 
 class Permission(Enum):
+    """Permissions granted by roles.
+
+    Each permission is also a bit of the permission masks stored in the
+    database, assigned by declaration order. New permissions must be added
+    at the end.
+    """
 
     FULL_CONTROL: str = 'Full Control'
 
@@ -32,6 +40,36 @@ class Permission(Enum):
     EDIT_ACCESS: str = 'Edit Access'
     DELETE_ACCESS: str = 'Delete Access'
 
+    @classmethod
+    def is_valid(cls, name: str) -> bool:
+        return name in cls.__members__
+    
+    @classmethod
+    def mask(cls, *permissions: Union[str, 'Permission']) -> int:
+        """Returns the bitmask of the given permissions."""
+
+        mask = 0
+
+        for perm in permissions:
+            name = perm.name if isinstance(perm, Permission) else perm
+
+            if name not in _PERMISSION_BITS:
+                raise ValueError(f"`{name}` is not a valid permission")
+            
+            mask |= _PERMISSION_BITS[name]
+
+        return mask
+    
+    @classmethod
+    def from_mask(cls, mask: int) -> List[str]:
+        """Returns the names of the permissions set in a bitmask."""
+
+        return [name for name, bit in _PERMISSION_BITS.items() if mask & bit]
+    
+    @property
+    def bit(self) -> int:
+        return _PERMISSION_BITS[self.name]
+    
     @classmethod
     def items(cls) -> Iterable[Tuple]:
         return [(const.name, const.value) for const in cls]
@@ -43,3 +81,7 @@ class Permission(Enum):
     @classmethod
     def values(cls) -> Iterable[str]:
         return [const.value for const in cls]
+
+
+_PERMISSION_BITS = {name: 1 << index
+        for index, name in enumerate(Permission.__members__)}
@@ -0,0 +1,23 @@
+from typing import (
+    Any,
+    Optional,
+)
+
+from flask_security import SQLAlchemyUserDatastore
+
+from .models import User
+
+
+class ACLUserDatastore(SQLAlchemyUserDatastore):
+    """User datastore that loads the user of a session together with the
+    data its permission checks need.
+    """
+
+    def find_user(self, case_insensitive: bool = False,
+            **kwargs: Any) -> Optional[User]:
+
+        # The session user loader looks users up by fs_uniquifier only.
+        if not case_insensitive and list(kwargs) == ['fs_uniquifier']:
+            return User.load_with_acl(**kwargs)
+        
+        return super().find_user(case_insensitive, **kwargs)
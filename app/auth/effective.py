@@ -0,0 +1,444 @@
+"""Maintenance of the effective permission tables.
+
+`effective_permissions` holds, for each user and access node, the masks of
+the roles the user holds on the node through user grants and through the
+groups they are a member of. `effective_group_permissions` holds the same
+for the Anonymous and Authenticated groups, whose grants apply to every
+visitor or every user and are therefore not copied per user.
+
+Both tables are refreshed incrementally from the after_flush hook of the
+auth models while the `effective` ACL query engine is configured, and can
+be rebuilt or checked with the `flask auth` commands.
+"""
+
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from flask import (
+    current_app,
+    has_app_context,
+)
+from sqlalchemy import (
+    Select,
+    delete,
+    insert,
+    inspect,
+    select,
+    tuple_,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .constants import (
+    ANONYMOUS,
+    AUTHENTICATED,
+    Permission,
+)
+
+
+_CHUNK_SIZE = 500
+
+Pair = Tuple[int, int]
+Row = Tuple[int, int, int]
+
+
+def is_enabled() -> bool:
+    """Returns True if the effective permission tables are in use."""
+
+    return has_app_context() \
+            and current_app.config.get('ACL_QUERY_ENGINE') == 'effective'
+
+def _chunks(items: Iterable, size: int = _CHUNK_SIZE) -> Iterable[List]:
+    items = list(items)
+
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def role_masks(connection: Connection) -> Dict[int, int]:
+    """Returns the permission mask of every role by id."""
+
+    from .models import Role
+
+    table = Role.__table__
+
+    return dict(connection.execute(
+            select(table.c.id, table.c.permission_mask)).all())
+
+def builtin_group_ids(connection: Connection) -> Set[int]:
+    """Returns the ids of the Anonymous and Authenticated groups."""
+
+    from .models import Group
+
+    table = Group.__table__
+
+    return set(connection.scalars(select(table.c.id)
+            .where(table.c.name.in_([ANONYMOUS, AUTHENTICATED]))))
+
+def _fetch(connection: Connection, *queries) -> List[Tuple]:
+    return [tuple(row) for query in queries
+            for row in connection.execute(query)]
+
+def _to_rows(grants: Iterable[Tuple[int, int, int]],
+        masks: Dict[int, int]) -> Set[Row]:
+
+    return {(subject_id, node_id, masks[role_id])
+            for subject_id, node_id, role_id in grants
+            if masks.get(role_id)}
+
+def compute_user_rows(connection: Connection,
+        pairs: Iterable[Pair] = None) -> Set[Row]:
+    """Computes the effective permission rows of the given (user id, access
+    node id) pairs, or of every pair when pairs is None.
+    """
+
+    from .models import (
+        GroupAccess,
+        UserAccess,
+        UsersOnGroups,
+    )
+
+    ua = UserAccess.__table__
+    ga = GroupAccess.__table__
+    uog = UsersOnGroups.__table__
+    builtin_ids = builtin_group_ids(connection)
+    masks = role_masks(connection)
+
+    user_query = select(ua.c.user_id, ua.c.access_id, ua.c.role_id)
+    group_query = select(uog.c.user_id, ga.c.access_id, ga.c.role_id)\
+            .join(uog, uog.c.group_id == ga.c.group_id)\
+            .where(ga.c.group_id.not_in(builtin_ids))
+
+    if pairs is None:
+        grants = _fetch(connection, user_query, group_query)
+        return _to_rows(grants, masks)
+
+    rows = set()
+
+    for chunk in _chunks(set(pairs)):
+        grants = _fetch(
+            connection,
+            user_query.where(tuple_(ua.c.user_id, ua.c.access_id).in_(chunk)),
+            group_query.where(
+                    tuple_(uog.c.user_id, ga.c.access_id).in_(chunk)),
+        )
+        rows |= _to_rows(grants, masks)
+
+    return rows
+
+def compute_group_rows(connection: Connection,
+        pairs: Iterable[Pair] = None) -> Set[Row]:
+    """Computes the effective permission rows of the given (group id, access
+    node id) pairs of the Anonymous and Authenticated groups, or of every
+    such pair when pairs is None.
+    """
+
+    from .models import GroupAccess
+
+    ga = GroupAccess.__table__
+    masks = role_masks(connection)
+    query = select(ga.c.group_id, ga.c.access_id, ga.c.role_id)\
+            .where(ga.c.group_id.in_(builtin_group_ids(connection)))
+
+    if pairs is None:
+        return _to_rows(connection.execute(query), masks)
+
+    rows = set()
+
+    for chunk in _chunks(set(pairs)):
+        rows |= _to_rows(connection.execute(query.where(
+                tuple_(ga.c.group_id, ga.c.access_id).in_(chunk))), masks)
+
+    return rows
+
+def _sync(connection: Connection, table, subject_column: str,
+        pairs: Set[Pair], rows: Set[Row]):
+
+    subject = table.c[subject_column]
+
+    for chunk in _chunks(pairs):
+        connection.execute(delete(table).where(
+                tuple_(subject, table.c.access_node_id).in_(chunk)))
+
+    for chunk in _chunks(rows):
+        connection.execute(insert(table), [
+            {subject_column: subject_id, 'access_node_id': node_id,
+                    'permissions': mask}
+            for subject_id, node_id, mask in chunk
+        ])
+
+def refresh(connection: Connection,
+        user_pairs: Iterable[Pair] = (),
+        group_pairs: Iterable[Pair] = (),
+        memberships: Iterable[Pair] = (),
+        role_ids: Iterable[int] = (),
+        user_ids: Iterable[int] = ()):
+    """Recomputes the effective permissions affected by changed grants.
+
+    user_pairs and group_pairs are (user or group id, access node id) pairs
+    whose grants changed, memberships are (user id, group id) pairs that
+    were added or removed, role_ids are roles whose permissions changed and
+    user_ids are deleted users, whose rows are dropped.
+    """
+
+    from .models import (
+        EffectiveGroupPermission,
+        EffectivePermission,
+        GroupAccess,
+        UserAccess,
+        UsersOnGroups,
+    )
+
+    ua = UserAccess.__table__
+    ga = GroupAccess.__table__
+    uog = UsersOnGroups.__table__
+    user_pairs = set(user_pairs)
+    group_pairs = set(group_pairs)
+    role_ids = set(role_ids)
+    ep = EffectivePermission.__table__
+
+    for chunk in _chunks(user_ids):
+        connection.execute(delete(ep).where(ep.c.user_id.in_(chunk)))
+
+    if role_ids:
+        user_pairs |= set(connection.execute(
+                select(ua.c.user_id, ua.c.access_id)
+                    .where(ua.c.role_id.in_(role_ids))).tuples())
+        group_pairs |= set(connection.execute(
+                select(ga.c.group_id, ga.c.access_id)
+                    .where(ga.c.role_id.in_(role_ids))).tuples())
+
+    if not (user_pairs or group_pairs or memberships):
+        return None
+
+    builtin_ids = builtin_group_ids(connection)
+    member_pairs = {pair for pair in group_pairs if pair[0] not in builtin_ids}
+    group_pairs -= member_pairs
+
+    # Grants of ordinary groups are expanded to their members.
+    for group_id, node_id in member_pairs:
+        user_pairs |= {(user_id, node_id) for user_id in connection.scalars(
+                select(uog.c.user_id).where(uog.c.group_id == group_id))}
+
+    for user_id, group_id in set(memberships):
+        if group_id not in builtin_ids:
+            user_pairs |= {(user_id, node_id) for node_id in connection\
+                    .scalars(select(ga.c.access_id)
+                        .where(ga.c.group_id == group_id))}
+
+    if user_pairs:
+        _sync(connection, EffectivePermission.__table__, 'user_id',
+                user_pairs, compute_user_rows(connection, user_pairs))
+
+    if group_pairs:
+        _sync(connection, EffectiveGroupPermission.__table__, 'group_id',
+                group_pairs, compute_group_rows(connection, group_pairs))
+
+def rebuild(connection: Connection) -> Tuple[int, int]:
+    """Rebuilds both effective permission tables from scratch. Returns the
+    number of user and group rows written.
+    """
+
+    from .models import (
+        EffectiveGroupPermission,
+        EffectivePermission,
+    )
+
+    user_rows = compute_user_rows(connection)
+    group_rows = compute_group_rows(connection)
+
+    for table, subject_column, rows in (
+            (EffectivePermission.__table__, 'user_id', user_rows),
+            (EffectiveGroupPermission.__table__, 'group_id', group_rows)):
+
+        connection.execute(delete(table))
+
+        for chunk in _chunks(rows):
+            connection.execute(insert(table), [
+                {subject_column: subject_id, 'access_node_id': node_id,
+                        'permissions': mask}
+                for subject_id, node_id, mask in chunk
+            ])
+
+    return len(user_rows), len(group_rows)
+
+def check(connection: Connection) -> Dict[str, Set[Row]]:
+    """Compares both effective permission tables with the grants. Returns
+    the rows missing from and the rows not expected in each table.
+    """
+
+    from .models import (
+        EffectiveGroupPermission,
+        EffectivePermission,
+    )
+
+    result = {}
+
+    for name, table, subject_column, expected in (
+            ('user', EffectivePermission.__table__, 'user_id',
+                compute_user_rows(connection)),
+            ('group', EffectiveGroupPermission.__table__, 'group_id',
+                compute_group_rows(connection))):
+
+        actual = set(connection.execute(select(table.c[subject_column],
+                table.c.access_node_id, table.c.permissions)).tuples())
+        result[f"{name}_missing"] = expected - actual
+        result[f"{name}_unexpected"] = actual - expected
+
+    return result
+
+def mask_filter(column, *permissions: Union[str, Permission],
+        require_all: bool = False):
+    """Returns a filter on a permission mask column matching any, or all
+    when require_all is set, of the permissions.
+    """
+
+    mask = Permission.mask(*permissions)
+
+    return (column.bitwise_and(mask) == mask) if require_all \
+            else (column.bitwise_and(mask) != 0)
+
+def accessible_nodes(user_id: Optional[int], group_ids: Iterable[int],
+        *permissions: Union[str, Permission], require_all: bool = False,
+        node_ids: Optional[Iterable[int]] = None) -> Select:
+    """Returns a select of the ids of the access nodes on which the user,
+    if any, or one of the Anonymous and Authenticated groups in group_ids
+    has the permissions, optionally limited to node_ids.
+    """
+
+    from .models import (
+        EffectiveGroupPermission,
+        EffectivePermission,
+    )
+
+    egp = EffectiveGroupPermission.__table__
+    ep = EffectivePermission.__table__
+    
+    query = select(egp.c.access_node_id)\
+            .where(egp.c.group_id.in_(list(group_ids)) \
+                & mask_filter(egp.c.permissions, *permissions,
+                    require_all=require_all))
+    
+    if node_ids is not None:
+        node_ids = list(node_ids)
+        query = query.where(egp.c.access_node_id.in_(node_ids))
+    
+    if user_id is not None:
+        user_query = select(ep.c.access_node_id)\
+                .where((ep.c.user_id == user_id) \
+                    & mask_filter(ep.c.permissions, *permissions,
+                        require_all=require_all))
+        
+        if node_ids is not None:
+            user_query = user_query.where(ep.c.access_node_id.in_(node_ids))
+
+        query = query.union(user_query)
+
+    return query
+
+def _history(obj, key: str) -> Tuple[list, list]:
+    history = inspect(obj).attrs[key].history
+    return list(history.added or []), list(history.deleted or [])
+
+def _values(obj, key: str) -> Set:
+    added, deleted = _history(obj, key)
+    current = getattr(obj, key, None)
+
+    return {value for value in [current, *added, *deleted]
+            if value is not None}
+
+def record_deletions(session: Session):
+    """Records the (user id, access node id) pairs granted to the members
+    of the groups being deleted and the ids of the users being deleted,
+    which the flush would remove before collect_changes can read them.
+    Must be called from a before_flush hook.
+    """
+
+    from .models import (
+        Group,
+        GroupAccess,
+        User,
+        UsersOnGroups,
+    )
+
+    ga = GroupAccess.__table__
+    uog = UsersOnGroups.__table__
+    group_ids = {obj.id for obj in session.deleted
+            if isinstance(obj, Group) and obj.id is not None}
+    user_ids = {obj.id for obj in session.deleted
+            if isinstance(obj, User) and obj.id is not None}
+    
+    if not (group_ids or user_ids):
+        return None
+    
+    deletions = session.info.setdefault('acl_deletions',
+            {'user_pairs': set(), 'user_ids': set()})
+    deletions['user_ids'] |= user_ids
+
+    for chunk in _chunks(group_ids):
+        deletions['user_pairs'] |= set(session.connection().execute(
+                select(uog.c.user_id, ga.c.access_id)
+                    .join(ga, ga.c.group_id == uog.c.group_id)
+                    .where(uog.c.group_id.in_(chunk))).tuples())
+
+def collect_changes(session: Session) -> Dict[str, Set]:
+    """Collects what refresh needs to know from the objects of a session
+    being flushed, along with the deletions recorded before the flush.
+    Must be called from an after_flush hook.
+    """
+
+    from .models import (
+        Group,
+        GroupAccess,
+        Role,
+        User,
+        UserAccess,
+        UsersOnGroups,
+    )
+
+    deletions = session.info.pop('acl_deletions', {})
+    changes = {
+        'user_pairs': set(deletions.get('user_pairs', ())),
+        'group_pairs': set(),
+        'memberships': set(),
+        'role_ids': set(),
+        'user_ids': set(deletions.get('user_ids', ())),
+    }
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, UserAccess):
+            changes['user_pairs'] |= {(user_id, node_id)
+                    for user_id in _values(obj, 'user_id')
+                    for node_id in _values(obj, 'access_id')}
+
+        elif isinstance(obj, GroupAccess):
+            changes['group_pairs'] |= {(group_id, node_id)
+                    for group_id in _values(obj, 'group_id')
+                    for node_id in _values(obj, 'access_id')}
+
+        elif isinstance(obj, UsersOnGroups):
+            changes['memberships'].add((obj.user_id, obj.group_id))
+
+        elif isinstance(obj, User):
+            added, deleted = _history(obj, 'groups')
+            changes['memberships'] |= {(obj.id, group.id)
+                    for group in added + deleted}
+
+        elif isinstance(obj, Group):
+            added, deleted = _history(obj, 'users')
+            changes['memberships'] |= {(user.id, obj.id)
+                    for user in added + deleted}
+
+        elif isinstance(obj, Role) and obj not in session.new:
+            added, deleted = _history(obj, 'permissions')
+
+            if added != deleted:
+                changes['role_ids'].add(obj.id)
+
+    return changes
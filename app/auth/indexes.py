@@ -0,0 +1,326 @@
+from threading import RLock
+from time import monotonic
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from flask import (
+    current_app,
+    has_app_context,
+)
+from sqlalchemy import select
+
+from .constants import (
+    ANONYMOUS,
+    SUPER_USER,
+    Permission,
+)
+from .shared_cache import (
+    on_invalidate,
+    shared_cache,
+)
+
+
+def permission_names(permissions: Iterable[Union[str, Permission]]
+        ) -> Tuple[str, ...]:
+    """Converts permissions to a sorted tuple of unique permission names.
+    Raises ValueError on an unknown permission.
+    """
+
+    names = set(perm.name if isinstance(perm, Permission) else perm
+            for perm in permissions)
+    
+    for name in names:
+        if not Permission.is_valid(name):
+            raise ValueError(f"`{name}` is not a valid permission")
+        
+    return tuple(sorted(names))
+
+
+class RoleIndex:
+    """Process-wide index of the roles granting each permission.
+
+    The index is loaded from the permission masks of the roles table on
+    first use and kept for ACL_ROLE_INDEX_TTL seconds, or until
+    `invalidate` is called, which the auth models do whenever a role is
+    written. The TTL bounds how long a worker that missed an invalidation
+    keeps an edited role mask.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._by_permission: Optional[Dict[str, FrozenSet[int]]] = None
+        self._by_combination: Dict[Tuple, FrozenSet[int]] = {}
+        self._expires_at = 0.0
+
+    def _load(self) -> Dict[str, FrozenSet[int]]:
+        from ..extensions import db
+        from .models import Role
+
+        if (shared := shared_cache.get('roles', 'by_permission')) is not None:
+            return {name: frozenset(role_ids)
+                    for name, role_ids in shared.items()}
+
+        by_permission = {name: set() for name in Permission.names()}
+
+        for role_id, mask in db.session.execute(
+                select(Role.id, Role.permission_mask)):
+            for name in Permission.from_mask(mask or 0):
+                by_permission[name].add(role_id)
+
+        shared_cache.set('roles', 'by_permission',
+                {name: sorted(role_ids)
+                    for name, role_ids in by_permission.items()})
+
+        return {name: frozenset(role_ids)
+                for name, role_ids in by_permission.items()}
+
+    def _permissions(self) -> Dict[str, FrozenSet[int]]:
+        ttl = current_app.config.get('ACL_ROLE_INDEX_TTL', 60) \
+                if has_app_context() else 0
+
+        with self._lock:
+            if self._by_permission is None or monotonic() >= self._expires_at:
+                self._by_permission = self._load()
+                self._by_combination = {}
+                self._expires_at = monotonic() + ttl
+
+            return self._by_permission
+        
+    def role_ids(self, *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> FrozenSet[int]:
+        """Returns the ids of the roles granting any (or all, when
+        require_all is set) of the given permissions.
+        """
+
+        names = permission_names(permissions)
+        key = (names, require_all and len(names) > 1)
+        by_permission = self._permissions()
+
+        if (role_ids := self._by_combination.get(key)) is not None:
+            return role_ids
+        
+        sets = [by_permission[name] for name in names]
+
+        if not sets:
+            role_ids = frozenset()
+        elif require_all:
+            role_ids = frozenset.intersection(*sets)
+        else:
+            role_ids = frozenset.union(*sets)
+
+        with self._lock:
+            if self._by_permission is by_permission:
+                self._by_combination[key] = role_ids
+
+        return role_ids
+    
+    def invalidate(self):
+        with self._lock:
+            self._by_permission = None
+            self._by_combination = {}
+
+
+class PublicNodeIndex:
+    """Process-wide index of the access nodes the Anonymous group has grants
+    on, so that anonymous visitors are authorized without any query.
+
+    The index is loaded with one query on first use and kept for
+    ACL_PUBLIC_NODE_TTL seconds, or until `invalidate` is called, which the
+    auth models do whenever ACL data is written. The TTL bounds how long a
+    worker that missed an invalidation keeps a revoked anonymous grant.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._roles_by_node: Optional[Dict[int, FrozenSet[int]]] = None
+        self._by_combination: Dict[Tuple, FrozenSet[int]] = {}
+        self._expires_at = 0.0
+
+    def _load(self) -> Dict[int, FrozenSet[int]]:
+        from ..extensions import db
+        from .models import (
+            Group,
+            GroupAccess,
+        )
+
+        if (shared := shared_cache.get('public_nodes', 'roles_by_node')) \
+                is not None:
+            return {int(node_id): frozenset(role_ids)
+                    for node_id, role_ids in shared.items()}
+        
+        roles_by_node = {}
+
+        for node_id, role_id in db.session.execute(
+                select(GroupAccess.access_id, GroupAccess.role_id)\
+                    .join(Group, Group.id == GroupAccess.group_id)\
+                    .where(Group.name == ANONYMOUS)):
+            roles_by_node.setdefault(node_id, set()).add(role_id)
+
+        shared_cache.set('public_nodes', 'roles_by_node',
+                {node_id: sorted(role_ids)
+                    for node_id, role_ids in roles_by_node.items()})
+
+        return {node_id: frozenset(role_ids)
+                for node_id, role_ids in roles_by_node.items()}
+    
+    def _nodes(self) -> Dict[int, FrozenSet[int]]:
+        ttl = current_app.config.get('ACL_PUBLIC_NODE_TTL', 60) \
+                if has_app_context() else 0
+
+        with self._lock:
+            if self._roles_by_node is None or monotonic() >= self._expires_at:
+                self._roles_by_node = self._load()
+                self._by_combination = {}
+                self._expires_at = monotonic() + ttl
+
+            return self._roles_by_node
+
+    def node_ids(self, *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> FrozenSet[int]:
+        """Returns the ids of the access nodes on which the Anonymous group
+        has any (or all, when require_all is set) of the permissions.
+        """
+
+        names = permission_names(permissions)
+        key = (names, require_all and len(names) > 1)
+        roles_by_node = self._nodes()
+
+        if (node_ids := self._by_combination.get(key)) is not None:
+            return node_ids
+        
+        role_ids = role_index.role_ids(*names, require_all=require_all)
+        node_ids = frozenset(node_id
+                for node_id, node_role_ids in roles_by_node.items()
+                if node_role_ids & role_ids)
+        
+        with self._lock:
+            if self._roles_by_node is roles_by_node:
+                self._by_combination[key] = node_ids
+
+        return node_ids
+    
+    def invalidate(self):
+        with self._lock:
+            self._roles_by_node = None
+            self._by_combination = {}
+
+
+class SuperUserIndex:
+    """Process-wide set of the ids of the users holding the Super User role
+    on the `auth` access node.
+
+    The set is loaded with one query and kept for ACL_SUPER_USER_TTL
+    seconds, or until `invalidate` is called, which the auth models do
+    whenever ACL data is written. The TTL bounds how long a worker that
+    missed an invalidation keeps a revoked grant.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._user_ids: Optional[FrozenSet[int]] = None
+        self._expires_at = 0.0
+
+    def _load(self) -> FrozenSet[int]:
+        from ..extensions import db
+        from .models import (
+            AccessNode,
+            Role,
+            UserAccess,
+        )
+
+        if (shared := shared_cache.get('super_users', 'ids')) is not None:
+            return frozenset(shared)
+        
+        user_ids = frozenset(db.session.scalars(select(UserAccess.user_id)\
+                .join(AccessNode, AccessNode.id == UserAccess.access_id)\
+                .join(Role, Role.id == UserAccess.role_id)\
+                .where((AccessNode.path == 'auth') \
+                    & (Role.name == SUPER_USER))))
+        
+        shared_cache.set('super_users', 'ids', sorted(user_ids))
+
+        return user_ids
+    
+    def user_ids(self) -> FrozenSet[int]:
+        """Returns the ids of the super users."""
+
+        ttl = current_app.config.get('ACL_SUPER_USER_TTL', 60) \
+                if has_app_context() else 0
+
+        with self._lock:
+            if self._user_ids is None or monotonic() >= self._expires_at:
+                self._user_ids = self._load()
+                self._expires_at = monotonic() + ttl
+
+            return self._user_ids
+        
+    def invalidate(self):
+        with self._lock:
+            self._user_ids = None
+
+
+class AccessNodeRegistry:
+    """Process-wide map of access node full names to ids, used to resolve
+    the model-level access nodes without a query per insert or permission
+    check.
+
+    Only names that resolve are kept, so nodes created later are picked up
+    on first use. The map is kept for ACL_NODE_REGISTRY_TTL seconds, or
+    until `invalidate` is called, which the auth models do whenever an
+    access node is renamed, moved or deleted. The TTL bounds how long a
+    worker that missed an invalidation resolves a name to a stale id.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._ids: Dict[str, int] = {}
+        self._expires_at = 0.0
+
+    def node_id(self, full_name: str) -> Optional[int]:
+        """Returns the id of the access node with the given full name, or
+        None if there is none.
+        """
+
+        from ..extensions import db
+        from .models import AccessNode
+
+        if monotonic() >= self._expires_at:
+            ttl = current_app.config.get('ACL_NODE_REGISTRY_TTL', 60) \
+                    if has_app_context() else 0
+
+            with self._lock:
+                self._ids = {}
+                self._expires_at = monotonic() + ttl
+
+        if (node_id := self._ids.get(full_name)) is not None:
+            return node_id
+        
+        node_id = db.session.scalar(select(AccessNode.id)\
+                .where(AccessNode.path == full_name))
+        
+        if node_id is not None:
+            with self._lock:
+                self._ids[full_name] = node_id
+
+        return node_id
+    
+    def invalidate(self):
+        with self._lock:
+            self._ids = {}
+
+
+role_index = RoleIndex()
+public_node_index = PublicNodeIndex()
+super_user_index = SuperUserIndex()
+access_node_registry = AccessNodeRegistry()
+on_invalidate(role_index.invalidate)
+on_invalidate(public_node_index.invalidate)
+on_invalidate(super_user_index.invalidate)
+on_invalidate(access_node_registry.invalidate)
@@ -0,0 +1,17 @@
+from flask import current_app
+
+from . import cache as acl_cache
+from .shared_cache import shared_cache
+
+
+def pin_acl_version():
+    shared_cache.pin_version()
+
+def clear_acl_cache(exception=None):
+    stats = acl_cache.stats()
+
+    if stats['hits'] or stats['misses']:
+        current_app.logger.debug('ACL cache: %d hits, %d misses',
+                stats['hits'], stats['misses'])
+
+    acl_cache.reset()
@@ -1,13 +1,18 @@
 from datetime import datetime
+from itertools import chain
 from typing import (
     Any,
     Dict,
+    FrozenSet,
+    Iterable,
     List,
     Optional,
+    Tuple,
     Union,
 )
 from uuid import uuid4
 
+from flask import current_app
 from flask_security import (
     AsaList,
     RoleMixin,
@@ -23,6 +28,15 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    update,
 )
 from sqlalchemy.exc import (
     NoResultFound,
@@ -33,8 +47,11 @@ from sqlalchemy.ext.mutable import MutableList
 from sqlalchemy.orm import (
     Mapped,
     Query,
+    attributes,
     mapped_column,
+    object_session,
     relationship,
+    selectinload,
     validates,
 )
 from sqlalchemy_utils import ScalarListType
@@ -45,6 +62,17 @@ from ..core.database import (
     UuidMixin,
 )
 from ..extensions import db
+from . import (
+    cache as acl_cache,
+    effective,
+)
+from .indexes import (
+    access_node_registry,
+    public_node_index,
+    role_index,
+    super_user_index,
+)
+from .shared_cache import shared_cache
 from .constants import (
     Permission,
     ANONYMOUS,
@@ -54,6 +82,64 @@ from .constants import (
 )
 
 
+def _permissions_key(permissions: List[Union[str, Permission]],
+        require_all: bool) -> Tuple:
+    """Normalizes permissions into a hashable key for the ACL cache."""
+
+    names = sorted(set(perm.name if isinstance(perm, Permission) else perm
+            for perm in permissions))
+
+    return tuple(names), bool(require_all) and len(names) > 1
+
+
+def builtin_group_id(name: str) -> Optional[int]:
+    """Returns the id of a group by name, such as the Anonymous and
+    Authenticated groups, looking it up once per request.
+    """
+
+    return acl_cache.cached(('group_id', name), lambda: db.session.scalar(
+            select(Group.id).where(Group.name == name)))
+
+def user_group_ids(user: 'User') -> FrozenSet[int]:
+    """Returns the ids of the groups the user is a member of, including the
+    Authenticated group, loading them once per request. Across requests
+    they are kept in the shared ACL cache, which any membership change
+    invalidates.
+
+    ACL filters pass them as a literal IN list rather than as a correlated
+    subquery through users_on_groups.
+    """
+
+    def load() -> FrozenSet[int]:
+        if (shared := shared_cache.get('user_groups', user.id)) is not None:
+            return frozenset(shared)
+        
+        group_ids = set(db.session.scalars(select(UsersOnGroups.group_id)\
+                .where(UsersOnGroups.user_id == user.id)))
+        
+        if (authenticated_id := builtin_group_id(AUTHENTICATED)) is not None:
+            group_ids.add(authenticated_id)
+
+        shared_cache.set('user_groups', user.id, sorted(group_ids))
+
+        return frozenset(group_ids)
+
+    return acl_cache.cached(('user_groups', user.id), load)
+
+def _residual(column):
+    """Wraps a column filtered with a literal IN list so that SQLite checks
+    it on the rows found through the access node index rather than probing
+    that index once per listed value, which is much slower for users in many
+    groups. Other databases get the plain column, as MySQL range scans such
+    lists well and an expression would keep it from using the index at all.
+    """
+
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return column + 0
+    
+    return column
+
+
 class UsersOnGroups(db.Model):
 
     __tablename__ = 'users_on_groups'
@@ -90,6 +176,8 @@ class AccessNode(AuthModel):
     name: Mapped[str] = mapped_column(String(255))
     parent_id: Mapped[Optional[int]] = mapped_column(Integer,
             ForeignKey('access_nodes.id'))
+    path: Mapped[Optional[str]] = mapped_column(String(512), unique=True,
+            index=True)
 
     children: Mapped[List['AccessNode']] = relationship('AccessNode',
             back_populates='parent')
@@ -116,7 +204,7 @@ class AccessNode(AuthModel):
                 raise NoResultFound(f"Parent `{parent_full_name}`" \
                         + " is not found")
             
-        access_node = cls(name=names[-1], parent=parent)
+        access_node = cls(name=names[-1], parent=parent, path=full_name)
         
         if user_accesses:
             db.session.add_all([
@@ -142,41 +230,238 @@ class AccessNode(AuthModel):
 
         return access_node
     
+    def copy_grants_from(self, source: 'AccessNode') -> int:
+        """Copies the user and group grants of source to this node, which
+        must have been flushed, with one select and one batched insert per
+        grant table. Returns the number of copied grants.
+        """
+
+        session = db.session
+        copied = 0
+        changes = {'user_pairs': set(), 'group_pairs': set()}
+
+        for model, subject, pairs in (
+                (UserAccess, 'user_id', changes['user_pairs']),
+                (GroupAccess, 'group_id', changes['group_pairs'])):
+            
+            table = model.__table__
+            grants = session.execute(select(table.c[subject], table.c.role_id)\
+                    .where(table.c.access_id == source.id)).all()
+            
+            if not grants:
+                continue
+
+            # UUIDs are generated in Python, which INSERT ... SELECT can't
+            # do portably.
+            session.execute(insert(table), [
+                {'uuid': uuid4(), 'access_id': self.id, subject: subject_id,
+                        'role_id': role_id}
+                for subject_id, role_id in grants
+            ])
+            pairs |= {(subject_id, self.id) for subject_id, _ in grants}
+            copied += len(grants)
+
+        if copied:
+            mark_acl_changed(session)
+            
+            if effective.is_enabled():
+                effective.refresh(session.connection(), **changes)
+
+        return copied
+    
+    def delete_subtree(self) -> int:
+        """Deletes the node, its descendants and all of their grants with a
+        constant number of statements instead of loading them through ORM
+        cascades. Records must no longer reference any of the nodes. Returns
+        the number of deleted nodes.
+        """
+
+        session = db.session
+        node_ids = self.subtree_ids()
+        nodes = AccessNode.__table__
+
+        for model in (EffectivePermission, EffectiveGroupPermission):
+            table = model.__table__
+            session.execute(delete(table)\
+                    .where(table.c.access_node_id.in_(node_ids)))
+        
+        for model in (UserAccess, GroupAccess):
+            table = model.__table__
+            session.execute(delete(table)\
+                    .where(table.c.access_id.in_(node_ids)))
+        
+        # Unlinked first, as MySQL checks the self-referencing key row by
+        # row.
+        session.execute(update(nodes).where(nodes.c.id.in_(node_ids))\
+                .values(parent_id=None))
+        session.execute(delete(nodes).where(nodes.c.id.in_(node_ids)))
+
+        # Expunging a node cascades to its loaded grants.
+        for obj in list(session.identity_map.values()):
+            if obj in session and ((isinstance(obj, AccessNode)
+                    and obj.id in node_ids)
+                    or (isinstance(obj, (UserAccess, GroupAccess))
+                        and obj.access_id in node_ids)):
+                session.expunge(obj)
+
+        mark_acl_changed(session)
+        session.info['acl_nodes_changed'] = True
+        access_node_registry.invalidate()
+
+        return len(node_ids)
+    
+    def _check_free(self, parent: Optional['AccessNode'], name: str):
+        if not name or '.' in name:
+            raise ValueError(f"`{name}` is not a valid access node name")
+        
+        path = name if parent is None else f"{parent.full_name}.{name}"
+        
+        if (other := AccessNode.get_by_full_name(path)) is not None \
+                and other is not self:
+            raise ValueError(f"Access node `{path}` already exists")
+    
+    def move_subtree(self, parent: Optional['AccessNode']):
+        """Moves the node with all of its descendants under parent, or to
+        the root when parent is None. The paths of the whole subtree are
+        rewritten with one UPDATE when the session is flushed. Grants are
+        kept on their nodes, so effective permissions are unaffected.
+        """
+
+        if parent is not None and (parent is self
+                or parent.full_name.startswith(self.full_name + '.')):
+            raise ValueError(f"`{self.full_name}` cannot be moved under"
+                    + " itself")
+        
+        self._check_free(parent, self.name)
+        self.parent = parent
+        db.session.flush()
+    
+    def rename(self, name: str):
+        """Renames the node. The paths of its descendants are rewritten with
+        one UPDATE when the session is flushed.
+        """
+
+        self._check_free(self.parent, name)
+        self.name = name
+        db.session.flush()
+    
     @classmethod
     def get_by_full_name(cls, full_name: str) -> Optional['AccessNode']:
-        names = full_name.split('.')
-        parent = None
+        return cls.query.filter_by(path=full_name).first()
+    
+    @classmethod
+    def rebuild_paths(cls) -> int:
+        """Recomputes the materialized path of every access node from the
+        name and parent columns. Returns the number of updated nodes.
+        """
+
+        rows = db.session.execute(
+                select(cls.id, cls.name, cls.parent_id, cls.path)).all()
+        nodes = {row.id: row for row in rows}
+        paths = {}
+
+        def resolve(node_id: int) -> str:
+            if node_id not in paths:
+                node = nodes[node_id]
+                paths[node_id] = node.name if node.parent_id is None \
+                        else resolve(node.parent_id) + '.' + node.name
+
+            return paths[node_id]
         
-        for name in names:
-            if (access_node := cls.query.filter_by(
-                    name=name, parent=parent).first()):
-                parent = access_node
-            else:
-                return None
-            
-        return access_node
+        changes = [{'node_id': node_id, 'node_path': resolve(node_id)}
+                for node_id, node in nodes.items()
+                if resolve(node_id) != node.path]
+        
+        if changes:
+            table = cls.__table__
+            db.session.execute(
+                update(table)\
+                    .where(table.c.id == bindparam('node_id'))\
+                    .values(path=bindparam('node_path')),
+                changes,
+            )
+            db.session.expire_all()
+
+        return len(changes)
     
     @classmethod
-    def get_model_access_node(cls) -> Optional['AccessNode']:
-        return cls.get_by_full_name(cls.access_node_full_name) \
+    def _hierarchy(cls, node_id: int, ancestors: bool):
+        """Returns a recursive CTE of the ids and depths of the node and its
+        ancestors, or of the node and its descendants.
+        """
+
+        table = cls.__table__
+        linked = table.alias('linked')
+        hierarchy = select(table.c.id, table.c.parent_id,
+                    literal(0).label('depth'))\
+                .where(table.c.id == node_id)\
+                .cte('hierarchy', recursive=True)
+        link = (linked.c.id == hierarchy.c.parent_id) if ancestors \
+                else (linked.c.parent_id == hierarchy.c.id)
+
+        return hierarchy.union_all(
+                select(linked.c.id, linked.c.parent_id, hierarchy.c.depth + 1)\
+                    .where(link))
+    
+    def ancestors(self, include_self: bool = False) -> List['AccessNode']:
+        """Returns the ancestors of the node, nearest first, with one
+        query.
+        """
+
+        hierarchy = self._hierarchy(self.id, ancestors=True)
+        query = AccessNode.query\
+                .join(hierarchy, AccessNode.id == hierarchy.c.id)\
+                .order_by(hierarchy.c.depth)
+        
+        if not include_self:
+            query = query.filter(hierarchy.c.depth > 0)
+
+        return query.all()
+    
+    def descendants(self, include_self: bool = False) -> List['AccessNode']:
+        """Returns the descendants of the node, shallowest first, with one
+        query.
+        """
+
+        hierarchy = self._hierarchy(self.id, ancestors=False)
+        query = AccessNode.query\
+                .join(hierarchy, AccessNode.id == hierarchy.c.id)\
+                .order_by(hierarchy.c.depth, AccessNode.name)
+        
+        if not include_self:
+            query = query.filter(hierarchy.c.depth > 0)
+
+        return query.all()
+    
+    def subtree_ids(self) -> List[int]:
+        """Returns the ids of the node and all of its descendants."""
+
+        hierarchy = self._hierarchy(self.id, ancestors=False)
+
+        return list(db.session.scalars(select(hierarchy.c.id)))
+    
+    @classmethod
+    def get_model_access_node_id(cls) -> Optional[int]:
+        return access_node_registry.node_id(cls.access_node_full_name) \
                 if cls.access_node_full_name else None
     
+    @classmethod
+    def get_model_access_node(cls) -> Optional['AccessNode']:
+        return db.session.get(cls, node_id) \
+                if (node_id := cls.get_model_access_node_id()) else None
+    
     def __repr__(self) -> str:
         return self.full_name
     
     @hybrid_property
     def full_name(self) -> str:
-        access_node = self
-        full_name = self.name
+        if self.path:
+            return self.path
         
-        while (parent := access_node.parent):
-            full_name = parent.name + '.' + full_name
-            access_node = parent
+        if self.id is not None:
+            return '.'.join(node.name
+                    for node in reversed(self.ancestors(include_self=True)))
 
-        return full_name
-    
-    @full_name.expression
-    def full_name(self):
         access_node = self
         full_name = self.name
         
@@ -185,59 +470,159 @@ class AccessNode(AuthModel):
             access_node = parent
 
         return full_name
+    
+    @full_name.expression
+    def full_name(cls):
+        return cls.path
         
-    def has_user_permissions(self, user: 'User',
+    @classmethod
+    def filter_permitted(cls, nodes: Iterable['AccessNode'], user: 'User',
             *permissions: List[Union[str, Permission]],
-            require_all: bool = False) -> bool:
+            require_all: bool = False) -> List['AccessNode']:
+        """Returns the nodes the user has the permissions on, answering for
+        all of them in a constant number of queries.
+        """
+
+        nodes = [node for node in nodes if node is not None]
+        permitted_ids = cls.permitted_ids((node.id for node in nodes), user,
+                *permissions, require_all=require_all)
         
-        if not (user and user.is_authenticated):
-            return self.has_group_permissions(
-                    Group.get_by_name(ANONYMOUS),
-                    *permissions, require_all=require_all)
-        
-        elif user.is_authenticated:
-            if self.has_group_permissions(
-                    Group.get_by_name(AUTHENTICATED),
-                    *permissions, require_all=require_all):
+        return [node for node in nodes if node.id in permitted_ids]
+    
+    @classmethod
+    def permitted_ids(cls, node_ids: Iterable[int], user: 'User',
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> FrozenSet[int]:
+        """Returns the ids among node_ids of the access nodes the user has
+        the permissions on. Decisions are shared with has_user_permissions
+        through the request cache.
+        """
+
+        user_id = user.id if user and user.is_authenticated else None
+        perms_key = _permissions_key(permissions, require_all)
+        permitted = set()
+        pending = set()
+
+        for node_id in set(node_ids):
+            if node_id is None:
+                continue
+
+            decision = acl_cache.get(('user', node_id, user_id, perms_key))
+
+            if decision is None:
+                pending.add(node_id)
+            elif decision:
+                permitted.add(node_id)
+
+        if pending:
+            perms_str = f"{user_id or 0}:{','.join(perms_key[0])}" \
+                    + f":{int(perms_key[1])}"
+            shared = shared_cache.get_many('decisions',
+                    (f"{node_id}:{perms_str}" for node_id in pending))
+            granted = {node_id for node_id in pending
+                    if shared.get(f"{node_id}:{perms_str}")}
+            queried = {node_id for node_id in pending
+                    if f"{node_id}:{perms_str}" not in shared}
+            
+            if queried:
+                queried_granted = cls._query_permitted_ids(queried, user,
+                        *permissions, require_all=require_all)
+                granted |= queried_granted
+                shared_cache.set_many('decisions', {
+                    f"{node_id}:{perms_str}": node_id in queried_granted
+                    for node_id in queried
+                })
+            
+            for node_id in pending:
+                acl_cache.put(('user', node_id, user_id, perms_key),
+                        node_id in granted)
                 
-                return True
-        
-        if getattr(user, 'is_super_user', False):
-            return True
+            permitted |= granted
 
-        cls = self.__class__
-        
-        valid_role_ids = [role.id for role in Role.query.all() \
-                if role.has_permissions(*permissions, require_all=require_all)]
-        
-        if not valid_role_ids:
-            return False
+        return frozenset(permitted)
+    
+    @classmethod
+    def _query_permitted_ids(cls, node_ids: Iterable[int], user: 'User',
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> FrozenSet[int]:
         
-        query = cls.query.join(UserAccess, cls.user_accesses, isouter=True)\
-                .join(GroupAccess, cls.group_accesses, isouter=True)\
+        node_ids = list(node_ids)
+        is_authenticated = bool(user and user.is_authenticated)
+        valid_role_ids = role_index.role_ids(*permissions,
+                require_all=require_all)
+        granted = frozenset()
         
-        user_filter = (UserAccess.user_id == user.id) \
-                & UserAccess.role_id.in_(valid_role_ids)
+        if valid_role_ids and not is_authenticated:
+            granted = public_node_index.node_ids(*permissions,
+                    require_all=require_all).intersection(node_ids)
+
+        elif valid_role_ids and effective.is_enabled():
+            granted = frozenset(db.session.scalars(effective.accessible_nodes(
+                user.id if is_authenticated else None,
+                [builtin_group_id(AUTHENTICATED if is_authenticated
+                    else ANONYMOUS)],
+                *permissions, require_all=require_all, node_ids=node_ids,
+            )))
+
+        elif valid_role_ids:
+            if is_authenticated:
+                group_ids = sorted(user_group_ids(user))
+            else:
+                group_ids = [group_id for group_id in
+                        (builtin_group_id(ANONYMOUS),) if group_id is not None]
+            
+            query = select(GroupAccess.access_id)\
+                    .where(GroupAccess.access_id.in_(node_ids) \
+                        & GroupAccess.group_id.in_(group_ids) \
+                        & GroupAccess.role_id.in_(valid_role_ids))
+            
+            if is_authenticated:
+                query = query.union(select(UserAccess.access_id)\
+                    .where(UserAccess.access_id.in_(node_ids) \
+                        & (UserAccess.user_id == user.id) \
+                        & UserAccess.role_id.in_(valid_role_ids)))
+                
+            granted = frozenset(db.session.scalars(query))
+
+        if len(granted) < len(node_ids) and is_authenticated \
+                and getattr(user, 'is_super_user', False):
+            return frozenset(node_ids)
+
+        return granted
         
-        authenticated_group = Group.get_by_name(AUTHENTICATED)
-        group_filter = (GroupAccess.group.has(Group.users.any(id=user.id)) \
-                | (GroupAccess.group_id == authenticated_group.id)) \
-                & GroupAccess.role_id.in_(valid_role_ids)
+    def has_user_permissions(self, user: 'User',
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> bool:
         
-        query = query.filter((UserAccess.access_id == self.id) \
-                & (UserAccess.access_id == self.id) 
-                & (user_filter | group_filter))
+        if self.id is None:
+            return bool(user and user.is_authenticated
+                    and getattr(user, 'is_super_user', False))
 
-        return query.count() > 0
+        return self.id in self.__class__.permitted_ids([self.id], user,
+                *permissions, require_all=require_all)
 
     def has_group_permissions(self, group: 'Group',
             *permissions: List[Union[str, Permission]],
             require_all: bool = False) -> bool:
         
+        if self.id is None or group.id is None:
+            return self._has_group_permissions(group, *permissions,
+                    require_all=require_all)
+
+        key = ('group', self.id, group.id,
+                _permissions_key(permissions, require_all))
+
+        return acl_cache.cached(key, lambda: self._has_group_permissions(
+                group, *permissions, require_all=require_all))
+
+    def _has_group_permissions(self, group: 'Group',
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> bool:
+        
         cls = self.__class__
         
-        valid_role_ids = [role.id for role in Role.query.all() \
-                if role.has_permissions(*permissions, require_all=require_all)]
+        valid_role_ids = role_index.role_ids(*permissions,
+                require_all=require_all)
         
         if not valid_role_ids:
             return False
@@ -281,52 +666,174 @@ class GranularAccessMixin:
     
     @classmethod
     def _access_node_id(cls) -> Optional[int]:
-        if cls.access_node_full_name is None:
-            return None
-        
-        return access_node.id if (access_node :=
-                AccessNode.get_by_full_name(cls.access_node_full_name)) \
-                else None
+        return cls.get_model_access_node_id()
     
     @classmethod
-    def get_model_access_node(cls) -> Optional['AccessNode']:
-        return AccessNode.get_by_full_name(cls.access_node_full_name) \
+    def get_model_access_node_id(cls) -> Optional[int]:
+        """Returns the id of the model-level access node, resolved once per
+        process.
+        """
+
+        return access_node_registry.node_id(cls.access_node_full_name) \
                 if cls.access_node_full_name else None
+    
+    @classmethod
+    def get_model_access_node(cls) -> Optional['AccessNode']:
+        return db.session.get(AccessNode, node_id) \
+                if (node_id := cls.get_model_access_node_id()) else None
             
     @classmethod
     def authorized_query(cls, *permissions: List[Union[str, Permission]],
             require_all: bool = False,
-            user: Union[UserMixin, 'User'] = current_user) -> Query:
+            user: Union[UserMixin, 'User'] = current_user,
+            engine: Optional[str] = None) -> Query:
+        """Returns a query of the records the user has the permissions on,
+        READ_RECORD by default.
+
+        engine selects how the ACL filter is expressed: `exists` uses
+        correlated EXISTS subqueries, `join` outer-joins the grant tables
+        and `effective` reads the effective permission tables. Defaults to
+        the ACL_QUERY_ENGINE config.
+        """
         
-        query = cls.query.join(AccessNode, cls.access_node)\
-                .join(UserAccess, AccessNode.user_accesses, isouter=True)\
-                .join(GroupAccess, AccessNode.group_accesses, isouter=True)
+        criterion = cls.authorized_filter(*permissions,
+                require_all=require_all, user=user, engine=engine)
+        
+        return cls.query if criterion is None else cls.query.filter(criterion)
+    
+    @classmethod
+    def authorized_filter(cls, *permissions: List[Union[str, Permission]],
+            require_all: bool = False,
+            user: Union[UserMixin, 'User'] = current_user,
+            engine: Optional[str] = None):
+        """Returns the criterion authorized_query filters on, or None when
+        the user is not restricted at all. The criterion only refers to the
+        id and access_node_id columns of the model and can be applied to
+        any statement selecting from it.
+        """
+        
+        permissions = permissions if permissions else [Permission.READ_RECORD]
+        valid_role_ids = role_index.role_ids(*permissions,
+                require_all=require_all)
         
+        if not valid_role_ids:
+            return (cls.id == 0) & (cls.id != 0)
+        
+        if (user and user.is_authenticated) \
+                and hasattr(user, 'is_super_user') and user.is_super_user:
+            return None
+        
+        engine = engine or current_app.config.get('ACL_QUERY_ENGINE',
+                'exists')
+        
+        if not (user and user.is_authenticated) and engine != 'join':
+            return cls.access_node_id.in_(sorted(
+                    public_node_index.node_ids(*permissions,
+                        require_all=require_all)))
+        elif engine == 'effective':
+            return cls._effective_authorized_filter(user, *permissions,
+                    require_all=require_all)
+        elif engine == 'exists':
+            return cls._exists_authorized_filter(valid_role_ids, user)
+        elif engine == 'join':
+            return cls._joined_authorized_filter(valid_role_ids, user)
+        else:
+            raise ValueError(f"Unknown ACL query engine `{engine}`")
+        
+    @classmethod
+    def group_authorized_query(cls, group: 'Group',
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> Query:
+        """Returns a query of the records the group has the permissions on
+        through its own grants, READ_RECORD by default.
+        """
+
         permissions = permissions if permissions else [Permission.READ_RECORD]
-        valid_role_ids = [role.id for role in Role.query.all() \
-                if role.has_permissions(*permissions, require_all=require_all)]
+        valid_role_ids = role_index.role_ids(*permissions,
+                require_all=require_all)
         
         if not valid_role_ids:
             return cls.query.filter((cls.id == 0) & (cls.id != 0))
         
+        return cls.query.filter(select(GroupAccess.id)\
+                .where((GroupAccess.access_id == cls.access_node_id) \
+                    & (GroupAccess.group_id == group.id) \
+                    & _residual(GroupAccess.role_id).in_(valid_role_ids))\
+                .exists())
+    
+    @classmethod
+    def _effective_authorized_filter(cls, user: Union[UserMixin, 'User'],
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False):
+        
+        if user and user.is_authenticated:
+            user_id, group_name = user.id, AUTHENTICATED
+        else:
+            user_id, group_name = None, ANONYMOUS
+
+        return cls.access_node_id.in_(effective.accessible_nodes(user_id,
+                [builtin_group_id(group_name)], *permissions,
+                require_all=require_all))
+    
+    @classmethod
+    def _exists_authorized_filter(cls, valid_role_ids: Iterable[int],
+            user: Union[UserMixin, 'User']):
+        
         if not (user and user.is_authenticated):
-            anonymous_group = Group.get_by_name(ANONYMOUS)
+            group_ids = [group_id for group_id in
+                    (builtin_group_id(ANONYMOUS),) if group_id is not None]
+        else:
+            group_ids = sorted(user_group_ids(user))
 
-            return query.filter((GroupAccess.group_id == anonymous_group.id) \
-                & GroupAccess.role_id.in_(valid_role_ids))
+        acl_filter = select(GroupAccess.id)\
+                .where((GroupAccess.access_id == cls.access_node_id) \
+                    & _residual(GroupAccess.group_id).in_(group_ids) \
+                    & _residual(GroupAccess.role_id).in_(valid_role_ids))\
+                .exists()
         
-        if hasattr(user, 'is_super_user') and user.is_super_user:
-            return cls.query
+        if user and user.is_authenticated:
+            acl_filter = acl_filter | select(UserAccess.id)\
+                .where((UserAccess.access_id == cls.access_node_id) \
+                    & (UserAccess.user_id == user.id) \
+                    & UserAccess.role_id.in_(valid_role_ids))\
+                .exists()
+            
+        return acl_filter
+    
+    @classmethod
+    def _joined_authorized_filter(cls, valid_role_ids: Iterable[int],
+            user: Union[UserMixin, 'User']):
+        
+        # The joins yield one row per matching grant, so the ids are
+        # selected in a subquery instead of joining the outer statement.
+        query = select(cls.id).join(AccessNode, cls.access_node)\
+                .join(UserAccess, AccessNode.user_accesses, isouter=True)\
+                .join(GroupAccess, AccessNode.group_accesses, isouter=True)
+        
+        if not (user and user.is_authenticated):
+            return cls.id.in_(query.where(
+                (GroupAccess.group_id == builtin_group_id(ANONYMOUS)) \
+                & GroupAccess.role_id.in_(valid_role_ids)))
         
         user_filter = (UserAccess.user_id == user.id) \
                 & UserAccess.role_id.in_(valid_role_ids)
+        group_filter = _residual(GroupAccess.group_id)\
+                    .in_(sorted(user_group_ids(user))) \
+                & _residual(GroupAccess.role_id).in_(valid_role_ids)
         
-        authenticated_group = Group.get_by_name(AUTHENTICATED)
-        group_filter = (GroupAccess.group.has(Group.users.any(User.id == user.id)) \
-                | (GroupAccess.group_id == authenticated_group.id)) \
-                & GroupAccess.role_id.in_(valid_role_ids)
-        
-        return query.filter(user_filter | group_filter)
+        return cls.id.in_(query.where(user_filter | group_filter))
+    
+    def is_permitted(self, user: Union[UserMixin, 'User'],
+            *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> bool:
+        """Returns True if the user has the permissions on the access node of
+        this record, without loading the access node.
+        """
+
+        return self.access_node_id is not None \
+                and self.access_node_id in AccessNode.permitted_ids(
+                    [self.access_node_id], user, *permissions,
+                    require_all=require_all)
     
     @hybrid_property
     def has_unique_access(self):
@@ -342,6 +849,8 @@ class Role(AuthModel, RoleMixin, GranularAccessMixin):
     description: Mapped[Optional[str]] = mapped_column(Text)
     permissions: Mapped[List[str]] = mapped_column(
             MutableList.as_mutable(AsaList()), default=[])
+    permission_mask: Mapped[int] = mapped_column(Integer, default=0,
+            server_default='0', index=True)
 
     user_accesses: Mapped[List['UserAccess']] = relationship(
             back_populates='role')
@@ -351,6 +860,41 @@ class Role(AuthModel, RoleMixin, GranularAccessMixin):
     @classmethod
     def get_by_name(cls, name: str) -> Optional['Role']:
         return cls.query.filter_by(name=name).first()
+    
+    @classmethod
+    def granting(cls, *permissions: List[Union[str, Permission]],
+            require_all: bool = False) -> Query:
+        """Returns a query of the roles granting any (or all, when
+        require_all is set) of the permissions, filtered on the permission
+        mask in SQL.
+        """
+
+        return cls.query.filter(effective.mask_filter(cls.permission_mask,
+                *permissions, require_all=require_all))
+    
+    @classmethod
+    def rebuild_permission_masks(cls) -> int:
+        """Recomputes the permission mask of every role from its permission
+        list. Returns the number of updated roles.
+        """
+
+        table = cls.__table__
+        changes = [{'role_id': role_id, 'role_mask': mask}
+                for role_id, perms, current in db.session.execute(
+                    select(table.c.id, table.c.permissions,
+                        table.c.permission_mask))
+                if (mask := Permission.mask(*(perms or []))) != current]
+        
+        if changes:
+            db.session.execute(
+                update(table)\
+                    .where(table.c.id == bindparam('role_id'))\
+                    .values(permission_mask=bindparam('role_mask')),
+                changes,
+            )
+            db.session.expire_all()
+
+        return len(changes)
 
     def __repr__(self) -> str:
         return self.name
@@ -361,11 +905,12 @@ class Role(AuthModel, RoleMixin, GranularAccessMixin):
         
         permissions = [perm.name if isinstance(perm, Permission) else perm
                 for perm in value]
-        valid_permissions = Permission.names()
 
         for perm in permissions:
-            if perm not in valid_permissions:
+            if not Permission.is_valid(perm):
                 raise ValueError(f"`{perm}` is not a valid permission")
+        
+        self.permission_mask = Permission.mask(*permissions)
             
         return permissions
     
@@ -373,16 +918,17 @@ class Role(AuthModel, RoleMixin, GranularAccessMixin):
             *permissions: List[Union[str, Permission]],
             require_all: bool = False) -> bool:
 
-        valid_permissions = Permission.names()
         permissions = [perm.name if isinstance(perm, Permission) else perm
                 for perm in permissions]
         
         for perm in permissions:
-            if perm not in valid_permissions:
+            if not Permission.is_valid(perm):
                 raise ValueError(f"`{perm}` is not a valid permission")
         
-        return (all if require_all else any)\
-                (perm in self.permissions for perm in permissions)
+        mask = Permission.mask(*permissions)
+        granted = Permission.mask(*(self.permissions or []))
+
+        return (granted & mask == mask) if require_all else bool(granted & mask)
 
 
 class User(AuthModel, UserMixin, GranularAccessMixin):
@@ -441,17 +987,53 @@ class User(AuthModel, UserMixin, GranularAccessMixin):
     def __repr__(self) -> str:
         return self.username + (f"<{self.email}>" if self.email else '')
     
+    @classmethod
+    def load_with_acl(cls, **kwargs: Dict[str, Any]) -> Optional['User']:
+        """Loads the first user matching kwargs together with its groups and
+        super user flag, and stores both in the ACL cache of the current
+        request so that permission checks on the user need no further
+        lookups.
+        """
+
+        is_super = select(UserAccess.id)\
+                .join(AccessNode, AccessNode.id == UserAccess.access_id)\
+                .join(Role, Role.id == UserAccess.role_id)\
+                .where((UserAccess.user_id == cls.id) \
+                    & (AccessNode.path == 'auth') \
+                    & (Role.name == SUPER_USER))\
+                .exists()
+        
+        row = db.session.execute(select(cls, is_super.label('is_super'))\
+                .filter_by(**kwargs)\
+                .options(selectinload(cls.groups))\
+                .limit(1)).first()
+        
+        if row is None:
+            return None
+        
+        user, is_super = row
+        group_ids = {group.id for group in user.groups}
+        
+        if (authenticated_id := builtin_group_id(AUTHENTICATED)) is not None:
+            group_ids.add(authenticated_id)
+
+        acl_cache.put(('super_user', user.id), bool(is_super))
+        acl_cache.put(('user_groups', user.id), frozenset(group_ids))
+
+        return user
+    
     @property
     def is_super_user(self) -> bool:
-        auth_access = AccessNode.get_by_full_name('auth')
-        super_user = Role.get_by_name(SUPER_USER)
-        user_id = current_user_id()
+        """True if the user holds the Super User role on the `auth` access
+        node. Cached per request, and per process for ACL_SUPER_USER_TTL
+        seconds.
+        """
 
-        if auth_access and super_user and current_user and user_id:
-            return UserAccess.query.filter_by(access_id=auth_access.id,
-                    role_id=super_user.id,user_id=user_id).count() > 0
-        else:
+        if self.id is None:
             return False
+        
+        return acl_cache.cached(('super_user', self.id),
+                lambda: self.id in super_user_index.user_ids())
     
 
 class WriterMixin:
@@ -528,7 +1110,7 @@ class UserAccess(AuthModel):
     role: Mapped[Role] = relationship(back_populates='user_accesses')
 
     def __repr__(self) -> str:
-        return self.access + ': ' + self.user + ' => ' + self.role
+        return f"{self.access}: {self.user} => {self.role}"
     
 
 class GroupAccess(AuthModel):
@@ -554,4 +1136,233 @@ class GroupAccess(AuthModel):
     role: Mapped[Role] = relationship(back_populates='group_accesses')
 
     def __repr__(self) -> str:
-        return self.access + ': ' + self.group + ' => ' + self.role
+        return f"{self.access}: {self.group} => {self.role}"
+    
+
+class EffectivePermission(db.Model):
+    """Derived permission masks a user holds on an access node, one row per
+    distinct role mask. Maintained by `app.auth.effective`.
+    """
+
+    __tablename__ = 'effective_permissions'
+    __table_args__ = (
+        UniqueConstraint(
+            'user_id',
+            'access_node_id',
+            'permissions',
+            name='uix_effective_permission',
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(Integer,
+            ForeignKey('users.id', ondelete='CASCADE'))
+    access_node_id: Mapped[int] = mapped_column(Integer,
+            ForeignKey('access_nodes.id', ondelete='CASCADE'), index=True)
+    permissions: Mapped[int] = mapped_column(Integer)
+
+
+class EffectiveGroupPermission(db.Model):
+    """Derived permission masks the Anonymous and Authenticated groups hold
+    on an access node, one row per distinct role mask. Maintained by
+    `app.auth.effective`.
+    """
+
+    __tablename__ = 'effective_group_permissions'
+    __table_args__ = (
+        UniqueConstraint(
+            'group_id',
+            'access_node_id',
+            'permissions',
+            name='uix_effective_group_permission',
+        ),
+    )
+
+    group_id: Mapped[int] = mapped_column(Integer,
+            ForeignKey('groups.id', ondelete='CASCADE'))
+    access_node_id: Mapped[int] = mapped_column(Integer,
+            ForeignKey('access_nodes.id', ondelete='CASCADE'), index=True)
+    permissions: Mapped[int] = mapped_column(Integer)
+
+
+def _parent_path(connection, target: AccessNode) -> Optional[str]:
+    if target.parent_id is None and target.parent is None:
+        return None
+
+    parent = target.parent
+
+    if parent is not None and parent.path is not None \
+            and parent.id == target.parent_id:
+        return parent.path
+    
+    table = AccessNode.__table__
+    parent_id = target.parent_id if target.parent_id is not None \
+            else parent.id
+    
+    return connection.scalar(
+            select(table.c.path).where(table.c.id == parent_id))
+
+
+@event.listens_for(AccessNode, 'before_insert')
+def _set_access_node_path(mapper, connection, target: AccessNode):
+    parent_path = _parent_path(connection, target)
+    target.path = target.name if parent_path is None \
+            else parent_path + '.' + target.name
+    
+
+@event.listens_for(AccessNode, 'before_update')
+def _update_access_node_path(mapper, connection, target: AccessNode):
+    """Keeps the materialized path of a renamed or reparented access node
+    and of all of its descendants in sync.
+    """
+
+    state = inspect(target)
+
+    if not any(state.attrs[key].history.has_changes()
+            for key in ('name', 'parent', 'parent_id')):
+        return None
+    
+    old_path = state.attrs.path.history.deleted[0] \
+            if state.attrs.path.history.deleted else target.path
+    parent_path = _parent_path(connection, target)
+    new_path = target.name if parent_path is None \
+            else parent_path + '.' + target.name
+    target.path = new_path
+
+    if old_path is None or old_path == new_path:
+        return None
+    
+    table = AccessNode.__table__
+    connection.execute(
+        update(table)\
+            .where(table.c.path.startswith(old_path + '.', autoescape=True))\
+            .values(path=literal(new_path) \
+                    + func.substr(table.c.path, len(old_path) + 1))
+    )
+
+    # Descendants already loaded in the session are synced in place so
+    # that they don't write back their stale paths.
+    if (session := object_session(target)) is not None:
+        for obj in list(session.identity_map.values()):
+            path = obj.__dict__.get('path') \
+                    if isinstance(obj, AccessNode) else None
+
+            if path and path.startswith(old_path + '.'):
+                attributes.set_committed_value(obj, 'path',
+                        new_path + path[len(old_path):])
+
+
+@event.listens_for(Role, 'before_insert')
+@event.listens_for(Role, 'before_update')
+def _sync_role_permission_mask(mapper, connection, target: Role):
+    """Keeps the permission mask of a role in sync with its permission
+    list, which may have been changed in place.
+    """
+
+    target.permission_mask = Permission.mask(*(target.permissions or []))
+
+
+_ACL_MODELS = (
+    AccessNode,
+    Group,
+    GroupAccess,
+    Role,
+    User,
+    UserAccess,
+    UsersOnGroups,
+)
+
+
+def mark_acl_changed(session):
+    """Records that the current transaction of session wrote ACL data, so
+    that ACL caches are dropped now and in every worker once it commits.
+    Bulk statements, which bypass the flush hooks, must call it.
+    """
+
+    acl_cache.clear()
+    session.info['acl_changed'] = True
+    public_node_index.invalidate()
+    super_user_index.invalidate()
+
+
+@event.listens_for(db.session, 'before_flush')
+def _before_acl_flush(session, flush_context, instances):
+    """Records the effective permissions that deleted users and groups held,
+    while their memberships and grants can still be read.
+    """
+
+    if effective.is_enabled():
+        effective.record_deletions(session)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _on_acl_flush(session, flush_context):
+    """Drops cached ACL decisions of the current request whenever access
+    nodes, grants, roles or group memberships are written, and brings the
+    derived ACL data up to date within the same transaction.
+    """
+
+    changed = [obj for obj in chain(session.new, session.dirty,
+            session.deleted) if isinstance(obj, _ACL_MODELS)]
+
+    if not changed:
+        return None
+    
+    acl_cache.clear()
+
+    if any(isinstance(obj, Role) for obj in changed):
+        session.info['acl_roles_changed'] = True
+        role_index.invalidate()
+
+    if any(isinstance(obj, AccessNode) and obj not in session.new
+            for obj in changed):
+        session.info['acl_nodes_changed'] = True
+        access_node_registry.invalidate()
+
+    if any(not isinstance(obj, User) or obj in session.deleted
+            or inspect(obj).attrs.groups.history.has_changes()
+            for obj in changed):
+        mark_acl_changed(session)
+
+    if effective.is_enabled():
+        effective.refresh(session.connection(),
+                **effective.collect_changes(session))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_acl_changes(session):
+    """Invalidates the shared ACL cache of every worker once ACL changes are
+    committed, and rebuilds the ACL indexes from committed rows.
+    """
+
+    if session.info.pop('acl_changed', False):
+        shared_cache.invalidate()
+        public_node_index.invalidate()
+        super_user_index.invalidate()
+
+    if session.info.pop('acl_roles_changed', False):
+        role_index.invalidate()
+        public_node_index.invalidate()
+
+    if session.info.pop('acl_nodes_changed', False):
+        access_node_registry.invalidate()
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_acl_changes(session, previous_transaction):
+    """Rebuilds the ACL indexes from committed rows once a transaction that
+    wrote ACL data is rolled back, as they may have been built from
+    in-flight data.
+    """
+
+    # Ids of access nodes created in the transaction may have been
+    # resolved.
+    if session.info.pop('acl_changed', False):
+        public_node_index.invalidate()
+        super_user_index.invalidate()
+        access_node_registry.invalidate()
+
+    if session.info.pop('acl_roles_changed', False):
+        role_index.invalidate()
+        public_node_index.invalidate()
+
+    session.info.pop('acl_nodes_changed', None)
@@ -0,0 +1,187 @@
+"""Effective permission matrix of every user on every access node.
+
+The matrix is computed from grants, memberships and role masks loaded with
+one query each, and is generated one user at a time so that it can be
+streamed without holding the full matrix in memory. The CSV and JSON
+encoders are shared with the streamed exports of the admin views.
+"""
+
+import csv
+from io import StringIO
+import json
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from .constants import (
+    ANONYMOUS,
+    AUTHENTICATED,
+    SUPER_USER,
+    Permission,
+)
+from .effective import role_masks
+
+
+def matrix_columns() -> List[str]:
+    """Returns the column names of the rows of permission_matrix."""
+
+    return ['user_id', 'username', 'email', 'access_node_id', 'access_node',
+            *Permission.names()]
+
+def _merge(target: Dict[int, int], node_id: int, mask: int):
+    if mask:
+        target[node_id] = target.get(node_id, 0) | mask
+
+def permission_matrix(connection: Connection,
+        node_ids: Optional[Iterable[int]] = None) -> Iterator[List]:
+    """Yields one row per user and access node on which the user has at
+    least one permission, with a 0 or 1 per permission, optionally limited
+    to node_ids. Anonymous visitors come first with an empty user id.
+
+    Super users are reported with every permission on every node, as the
+    permission checks grant them.
+    """
+
+    from .models import (
+        AccessNode,
+        Group,
+        GroupAccess,
+        Role,
+        User,
+        UserAccess,
+        UsersOnGroups,
+    )
+
+    nodes = AccessNode.__table__
+    users = User.__table__
+    ua = UserAccess.__table__
+    ga = GroupAccess.__table__
+    uog = UsersOnGroups.__table__
+    groups = Group.__table__
+    roles = Role.__table__
+
+    node_filter = None if node_ids is None else set(node_ids)
+    paths = {node_id: path for node_id, path in connection.execute(
+            select(nodes.c.id, nodes.c.path).order_by(nodes.c.path))
+            if node_filter is None or node_id in node_filter}
+    masks = role_masks(connection)
+    builtin_ids = dict(connection.execute(select(groups.c.name, groups.c.id)\
+            .where(groups.c.name.in_([ANONYMOUS, AUTHENTICATED]))).all())
+    super_role_ids = set(connection.scalars(select(roles.c.id)\
+            .where(roles.c.name == SUPER_USER)))
+    auth_node_id = connection.scalar(select(nodes.c.id)\
+            .where(nodes.c.path == 'auth'))
+
+    members: Dict[int, Set[int]] = {}
+
+    for user_id, group_id in connection.execute(
+            select(uog.c.user_id, uog.c.group_id)):
+        members.setdefault(group_id, set()).add(user_id)
+
+    by_user: Dict[int, Dict[int, int]] = {}
+    by_group: Dict[int, Dict[int, int]] = {}
+    super_user_ids = set()
+
+    for user_id, node_id, role_id in connection.execute(
+            select(ua.c.user_id, ua.c.access_id, ua.c.role_id)):
+        if node_id == auth_node_id and role_id in super_role_ids:
+            super_user_ids.add(user_id)
+
+        if node_id in paths:
+            _merge(by_user.setdefault(user_id, {}), node_id,
+                    masks.get(role_id, 0))
+
+    for group_id, node_id, role_id in connection.execute(
+            select(ga.c.group_id, ga.c.access_id, ga.c.role_id)):
+        if node_id in paths:
+            _merge(by_group.setdefault(group_id, {}), node_id,
+                    masks.get(role_id, 0))
+
+    user_groups: Dict[int, List[int]] = {}
+
+    for group_id, user_ids in members.items():
+        if group_id in by_group:
+            for user_id in user_ids:
+                user_groups.setdefault(user_id, []).append(group_id)
+
+    all_permissions = Permission.mask(*Permission.names())
+    bits = [perm.bit for perm in Permission]
+
+    def rows(user_id, username, email, granted: Dict[int, int]):
+        for node_id in sorted(granted, key=paths.__getitem__):
+            if (mask := granted[node_id]):
+                yield [user_id, username, email, node_id, paths[node_id],
+                        *(int(bool(mask & bit)) for bit in bits)]
+
+    yield from rows('', ANONYMOUS, '',
+            by_group.get(builtin_ids.get(ANONYMOUS), {}))
+
+    authenticated = by_group.get(builtin_ids.get(AUTHENTICATED), {})
+
+    for user_id, username, email in connection.execute(
+            select(users.c.id, users.c.username, users.c.email)\
+                .order_by(users.c.id)).all():
+
+        if user_id in super_user_ids:
+            granted = dict.fromkeys(paths, all_permissions)
+        else:
+            granted = dict(authenticated)
+
+            for node_id, mask in by_user.get(user_id, {}).items():
+                _merge(granted, node_id, mask)
+
+            for group_id in user_groups.get(user_id, []):
+                for node_id, mask in by_group[group_id].items():
+                    _merge(granted, node_id, mask)
+
+        yield from rows(user_id, username, email, granted)
+
+def iter_csv(rows: Iterable[List], columns: List[str],
+        chunk_size: int = 1000) -> Iterator[str]:
+    """Encodes rows as CSV after a header, yielding chunks of chunk_size
+    rows.
+    """
+
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for index, row in enumerate(rows, 1):
+        writer.writerow(row)
+
+        if index % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+def iter_json(rows: Iterable[Dict[str, Any]],
+        chunk_size: int = 1000) -> Iterator[str]:
+    """Encodes rows as a JSON array of objects, yielding chunks of
+    chunk_size rows. Values JSON doesn't know are written as strings.
+    """
+
+    buffer = StringIO()
+    buffer.write('[')
+
+    for index, row in enumerate(rows, 1):
+        buffer.write(',\n' if index > 1 else '\n')
+        json.dump(row, buffer, default=str)
+
+        if index % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    buffer.write('\n]\n')
+    yield buffer.getvalue()
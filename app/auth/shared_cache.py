@@ -0,0 +1,225 @@
+"""ACL cache shared by every worker through Redis.
+
+Entries are stored under a version counter. A commit that writes access
+nodes, roles, groups, grants or memberships increments the counter, which
+orphans every entry at once, and publishes a message so that each worker
+also drops its in-process indexes. Requests read the counter before any ACL
+data and store what they compute under that version only. Without a Redis
+client, or while Redis is unreachable, every call is a no-op and callers
+fall back to their in-process path.
+"""
+
+import json
+from os import getpid
+from threading import Lock
+from time import monotonic
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+from flask import (
+    Flask,
+    current_app,
+    has_app_context,
+)
+from redis import Redis
+from redis.exceptions import RedisError
+
+from . import cache as acl_cache
+
+
+_VERSION_KEY = 'acl:version'
+_CHANNEL = 'acl:invalidate'
+_RETRY_AFTER = 30.0
+
+_listeners: List[Callable[[], None]] = []
+
+
+def on_invalidate(func: Callable[[], None]) -> Callable[[], None]:
+    """Registers func to be called in every worker whenever the ACL data
+    changes.
+    """
+
+    _listeners.append(func)
+    return func
+
+def _notify_listeners():
+    for listener in _listeners:
+        listener()
+
+
+class SharedACLCache:
+
+    def __init__(self, app: Optional[Flask] = None,
+            redis: Optional[Redis] = None):
+
+        self._lock = Lock()
+        self._subscriber_pid: Optional[int] = None
+        self._seen_version: Optional[int] = None
+        self._down_until = 0.0
+
+        if app is not None:
+            self.init_app(app, redis)
+
+    def init_app(self, app: Flask, redis: Optional[Redis] = None):
+        app.config.setdefault('ACL_SHARED_CACHE_TTL', 300)
+        app.extensions['acl_shared_cache'] = redis
+
+    @property
+    def redis(self) -> Optional[Redis]:
+        if not has_app_context() or monotonic() < self._down_until:
+            return None
+
+        return current_app.extensions.get('acl_shared_cache', None)
+
+    def _failed(self, ex: Exception):
+        self._down_until = monotonic() + _RETRY_AFTER
+        current_app.logger.warning('Shared ACL cache is unavailable: %s', ex)
+
+    def _ensure_subscriber(self, redis: Redis):
+        # Started lazily so that each forked worker gets its own thread.
+        if self._subscriber_pid == getpid():
+            return None
+
+        with self._lock:
+            if self._subscriber_pid == getpid():
+                return None
+
+            # Invalidations may have been missed while unsubscribed.
+            if self._subscriber_pid is not None:
+                _notify_listeners()
+
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{_CHANNEL: lambda message:
+                    _notify_listeners()})
+            pubsub.run_in_thread(sleep_time=1.0, daemon=True,
+                    exception_handler=self._subscriber_failed)
+            self._subscriber_pid = getpid()
+
+    def _subscriber_failed(self, ex: Exception, pubsub, thread):
+        thread.stop()
+        pubsub.close()
+
+        with self._lock:
+            self._subscriber_pid = -1
+            self._down_until = monotonic() + _RETRY_AFTER
+
+    def _version(self, redis: Redis) -> int:
+        # Pinned at the start of requests by pin_version, read lazily
+        # elsewhere.
+        return acl_cache.cached(('shared_version',),
+                lambda: int(redis.get(_VERSION_KEY) or 0))
+
+    def pin_version(self):
+        """Reads the version counter for the rest of the request. Must run
+        before any ACL data is loaded, so that decisions computed from data
+        older than a commit are never stored under the version that commit
+        created. In-process indexes loaded under another version are
+        dropped, as their invalidation message may not have arrived yet.
+        """
+
+        if (redis := self.redis) is None:
+            return None
+
+        try:
+            self._ensure_subscriber(redis)
+            version = int(redis.get(_VERSION_KEY) or 0)
+        except RedisError as ex:
+            self._failed(ex)
+            return None
+
+        if version != self._seen_version:
+            self._seen_version = version
+            _notify_listeners()
+
+        acl_cache.put(('shared_version',), version)
+
+    def _key(self, redis: Redis, namespace: str, key: Any) -> str:
+        return f"acl:{self._version(redis)}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: Any) -> Optional[Any]:
+        """Returns the entry stored under namespace and key, or None."""
+
+        return self.get_many(namespace, [key]).get(key)
+
+    def get_many(self, namespace: str, keys: Iterable[Any]) -> Dict[Any, Any]:
+        """Returns the entries found under namespace for the given keys.
+        Nothing is found while the current transaction has uncommitted ACL
+        changes, which the entries don't reflect.
+        """
+
+        from ..extensions import db
+
+        keys = list(keys)
+
+        if not keys or (redis := self.redis) is None \
+                or db.session.info.get('acl_changed', False):
+            return {}
+
+        try:
+            self._ensure_subscriber(redis)
+            values = redis.mget([self._key(redis, namespace, key)
+                    for key in keys])
+        except RedisError as ex:
+            self._failed(ex)
+            return {}
+
+        return {key: json.loads(value)
+                for key, value in zip(keys, values) if value is not None}
+
+    def set(self, namespace: str, key: Any, value: Any):
+        """Stores an entry under namespace and key."""
+
+        self.set_many(namespace, {key: value})
+
+    def set_many(self, namespace: str, entries: Dict[Any, Any]):
+        """Stores the entries under namespace. Nothing is stored while the
+        current transaction has uncommitted ACL changes.
+        """
+
+        from ..extensions import db
+
+        if not entries or (redis := self.redis) is None \
+                or db.session.info.get('acl_changed', False):
+            return None
+
+        ttl = current_app.config['ACL_SHARED_CACHE_TTL']
+
+        try:
+            with redis.pipeline(transaction=False) as pipe:
+                for key, value in entries.items():
+                    pipe.set(self._key(redis, namespace, key),
+                            json.dumps(value), ex=ttl)
+
+                pipe.execute()
+        except RedisError as ex:
+            self._failed(ex)
+
+    def invalidate(self):
+        """Orphans every shared entry and tells every worker to drop its
+        in-process ACL indexes.
+        """
+
+        acl_cache.clear()
+
+        if (redis := self.redis) is None:
+            return None
+
+        try:
+            version = redis.incr(_VERSION_KEY)
+            redis.publish(_CHANNEL, 'invalidate')
+        except RedisError as ex:
+            self._failed(ex)
+            return None
+
+        # The rest of the request reads committed data.
+        self._seen_version = version
+        acl_cache.put(('shared_version',), version)
+
+
+shared_cache = SharedACLCache()
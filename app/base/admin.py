@@ -1,18 +1,12 @@
-from typing import Any, Tuple
 from flask import flash
 from flask_admin.actions import action
-from flask_admin.babel import (
-    gettext,
-    ngettext,
-)
+from flask_admin.babel import gettext
 from flask_admin.form.fields import Select2Field
-from flask_security import current_user
 from pytubefix import YouTube
 
 from ..auth.admin import (
     AdminAccessModelView,
 )
-from ..auth.constants import Permission
 from ..core.admin import (
     CKTextAreaField,
     Select2MultipleField,
@@ -41,6 +35,9 @@ class PeopleAdmin(AdminAccessModelView):
         'postfix',
     )
     column_filters = column_list
+    keyset_pagination = True
+    count_estimate_threshold = 100000
+    can_export = True
     column_searchable_list = (
         'prefix',
         'first_name',
@@ -67,6 +64,8 @@ class PeopleAdmin(AdminAccessModelView):
         'user',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',
+            'user',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -103,6 +102,7 @@ class SitePagesAdmin(AdminAccessModelView):
         'active',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -113,34 +113,11 @@ class SitePagesAdmin(AdminAccessModelView):
     )
     form_edit_rules = form_create_rules
 
-    def _activate_record(self, record, flag: bool = True) -> Tuple[Any, bool]:
-        has_permission = record.access_node.has_user_permissions(
-                current_user, Permission.EDIT_RECORD)
-
-        if has_permission:
-            record.active = flag
-            self.session.commit()
-
-        return record, has_permission
-    
     @action('enable', 'Enable', 'Are you sure you want to enable the selected pages?')
     def action_enable(self, ids):
         try:
-            updated_records = self.update_records(
-                ids,
-                lambda r: self._activate_record(r, True),
-            )
-            count = len(updated_records)
-
-            flash(
-                ngettext(
-                    'Record was successfully enabled.',
-                    f"{count} records were successfully enabled.",
-                    count,
-                    count=count,
-                ),
-                'success',
-            )
+            self.flash_update_outcomes(
+                    self.update_records(ids, {'active': True}), 'enabled')
         except Exception as ex:
             if not self.handle_view_exception(ex):
                 raise
@@ -150,21 +127,8 @@ class SitePagesAdmin(AdminAccessModelView):
     @action('disable', 'Disable', 'Are you sure you want to disable the selected pages?')
     def action_disable(self, ids):
         try:
-            updated_records = self.update_records(
-                ids,
-                lambda r: self._activate_record(r, False),
-            )
-            count = len(updated_records)
-
-            flash(
-                ngettext(
-                    'Record was successfully disabled.',
-                    f"{count} records were successfully disabled.",
-                    count,
-                    count=count,
-                ),
-                'success',
-            )
+            self.flash_update_outcomes(
+                    self.update_records(ids, {'active': False}), 'disabled')
         except Exception as ex:
             if not self.handle_view_exception(ex):
                 raise
@@ -193,6 +157,7 @@ class MinistriesAdmin(AdminAccessModelView):
         'logo_url',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -212,6 +177,9 @@ class PreachingsAdmin(AdminAccessModelView):
     column_filters = column_list
     column_searchable_list = ('title', 'preacher.full_name', 'description',)
     column_default_sort = [('start_datetime', True),]
+    keyset_pagination = True
+    count_estimate_threshold = 100000
+    can_export = True
     form_columns = (
         'uuid',
         'created_at',
@@ -229,6 +197,9 @@ class PreachingsAdmin(AdminAccessModelView):
         'outline_url',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',
+            'preacher',)
+    list_eager_loads = ('preacher',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -290,6 +261,7 @@ class EventsAdmin(AdminAccessModelView):
         'include_time',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -312,6 +284,9 @@ class BulletinPostsAdmin(AdminAccessModelView):
 
     column_list = ('title', 'content', 'source', 'pinned_until',)
     column_filters = column_list
+    column_default_sort = [('created_at', True),]
+    keyset_pagination = True
+    can_export = True
     column_searchable_list = ('title', 'content', 'source',)
     form_args = {
         'image_position': {'choices': BulletinPost.IMAGE_POSITION_CHOICES},
@@ -341,6 +316,7 @@ class BulletinPostsAdmin(AdminAccessModelView):
         'pinned_until',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
@@ -361,6 +337,9 @@ class PrayerRequestsAdmin(AdminAccessModelView):
     
     column_list = ('title', 'description', 'status',)
     column_filters = column_list
+    column_default_sort = [('created_at', True),]
+    keyset_pagination = True
+    can_export = True
     column_searchable_list = ('title', 'description', 'status',)
     form_args = {
         'status': {'choices': PrayerRequest.STATUS_CHOICES},
@@ -384,6 +363,8 @@ class PrayerRequestsAdmin(AdminAccessModelView):
         'updates',
     )
     column_details_list = exclude(form_columns, ['use_unique_access'])
+    details_eager_loads = ('created_by', 'updated_by', 'access_node',
+            'people_praying',)
     form_create_rules = (
         'access_node',
         'use_unique_access',
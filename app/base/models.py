@@ -15,6 +15,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -156,6 +157,9 @@ class Ministry(BaseModel):
 class Preaching(BaseModel):
 
     __tablename__ = 'preachings'
+    __table_args__ = (
+        Index('ix_preachings_start_datetime_id', 'start_datetime', 'id'),
+    )
     access_node_full_name = f"base.{__tablename__}"
 
     title: Mapped[str] = mapped_column(String(255))
@@ -242,6 +246,9 @@ class Event(BaseModel):
 class BulletinPost(BaseModel):
 
     __tablename__ = 'bulletin_posts'
+    __table_args__ = (
+        Index('ix_bulletin_posts_created_at_id', 'created_at', 'id'),
+    )
     access_node_full_name = f"base.{__tablename__}"
 
     IMAGE_POSITION_CHOICES: Tuple[Tuple[str, str]] = (
@@ -270,6 +277,9 @@ class BulletinPost(BaseModel):
 class PrayerRequest(BaseModel):
 
     __tablename__ = 'prayer_requests'
+    __table_args__ = (
+        Index('ix_prayer_requests_created_at_id', 'created_at', 'id'),
+    )
     access_node_full_name = f"base.{__tablename__}"
 
     STATUS_CHOICES: Tuple[Tuple[str, str]] = (
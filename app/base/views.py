@@ -36,10 +36,7 @@ def display_page(title: str) -> str:
     
     if not page.active:
         abort(401)
-    elif not page.access_node.has_user_permissions(
-        current_user,
-        Permission.READ_RECORD
-    ):
+    elif not page.is_permitted(current_user, Permission.READ_RECORD):
         if current_user.is_authenticated:
             abort(403)
         else:
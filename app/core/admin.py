@@ -1,7 +1,15 @@
-from datetime import datetime
+from base64 import (
+    urlsafe_b64decode,
+    urlsafe_b64encode,
+)
+from datetime import (
+    date,
+    datetime,
+)
+import json
 from typing import (
     Any,
-    Callable,
+    Dict,
     Iterable,
     Optional,
     Tuple,
@@ -10,6 +18,7 @@ from typing import (
 
 from flask import (
     flash,
+    g,
     redirect,
     request,
     url_for,
@@ -18,14 +27,28 @@ from flask_admin import (
     AdminIndexView as BaseAdminIndexView,
     expose,
 )
-from flask_admin.babel import gettext
+from flask_admin.babel import (
+    gettext,
+    ngettext,
+)
 from flask_admin.form.fields import Select2Field
 from flask_admin.helpers import get_redirect_target
-from flask_admin.contrib.sqla import ModelView
+from flask_admin.contrib.sqla import (
+    ModelView,
+    tools,
+)
 from flask_security import current_user
+from sqlalchemy import (
+    select,
+    true,
+    tuple_,
+    update,
+)
 from sqlalchemy.orm import(
     DeclarativeBase,
     Session,
+    joinedload,
+    selectinload,
 )
 from wtforms import TextAreaField
 from wtforms.widgets import TextArea
@@ -37,6 +60,74 @@ from .localization import to_user_timezone
 def _datetime_format(view, value: datetime):
     return to_user_timezone(value).strftime('%B %d, %Y, %I:%M %p')
 
+def eager_load_options(model: DeclarativeBase,
+        paths: Iterable[str]) -> list:
+    """Returns the loader options of the relationships in paths, dotted
+    paths starting from model. Relationships to one record are joined and
+    collections are loaded with a SELECT IN query.
+    """
+
+    options = []
+
+    for path in paths:
+        option, current = None, model
+
+        for key in path.split('.'):
+            attribute = getattr(current, key)
+            loader = selectinload if attribute.property.uselist \
+                    else joinedload
+            option = loader(attribute) if option is None \
+                    else getattr(option, loader.__name__)(attribute)
+            current = attribute.property.mapper.class_
+
+        options.append(option)
+
+    return options
+
+def _encode_cursor(value: Any, record_id: int) -> str:
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+
+    payload = json.dumps([value, record_id], separators=(',', ':'))
+
+    return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor: str, column) -> Optional[Tuple[Any, int]]:
+    try:
+        value, record_id = json.loads(urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)))
+
+        if value is not None and column is not None \
+                and column.type.python_type in (date, datetime):
+            value = column.type.python_type.fromisoformat(value)
+        
+        return value, int(record_id)
+    except (ValueError, TypeError, NotImplementedError):
+        return None
+
+def _seek_filter(column, id_column, value: Any, record_id: int,
+        descending: bool):
+    """Returns the criterion of the rows that come after value and
+    record_id when ordering by column, if any, then id. NULLs come first in
+    ascending order, as MySQL and SQLite sort them.
+    """
+
+    if column is None:
+        return (id_column < record_id) if descending \
+                else (id_column > record_id)
+    elif value is None:
+        return (column.is_(None) & (id_column < record_id)) if descending \
+                else (column.is_not(None) | (id_column > record_id))
+    
+    # Row values let the database seek into the (column, id) index.
+    key, cursor = tuple_(column, id_column), tuple_(value, record_id)
+
+    if not descending:
+        return key > cursor
+    
+    return ((key < cursor) | column.is_(None)) if column.nullable \
+            else (key < cursor)
+
 
 class CKTextAreaWidget(TextArea):
     
@@ -145,12 +236,26 @@ class AdminModelView(ModelView):
     can_edit = True
     can_delete = True
     can_view_details = True
+    list_template = 'admin/model/app_list.html'
     column_hide_backrefs = False
     column_type_formatters = {
         datetime: _datetime_format,
     }
     extra_js = ['//cdn.ckeditor.com/4.6.0/standard/ckeditor.js']
 
+    list_eager_loads: Tuple[str, ...] = ()
+    """Relationships, as dotted paths, rendered by the list view and loaded
+    together with its records instead of once per row."""
+
+    details_eager_loads: Tuple[str, ...] = ()
+    """Relationships, as dotted paths, rendered by the details and edit
+    views and loaded together with the record."""
+
+    keyset_pagination = False
+    """Pages the list view in its default order with cursors on the default
+    sort column and id instead of OFFSET. The default sort must be a single
+    column of the model, or none to page by id."""
+
     def __init__(self, model=None, session=None, name=None, category=None,
             endpoint=None, url=None, static_folder=None, menu_class_name=None,
             menu_icon_type=None, menu_icon_value=None):
@@ -172,6 +277,146 @@ class AdminModelView(ModelView):
     def is_accessible(self):
         return current_user != None and current_user.is_authenticated
     
+    def get_query(self):
+        return super().get_query().options(
+                *eager_load_options(self.model, self.list_eager_loads))
+    
+    def _get_keyset_column(self):
+        # Returns the default sort column and direction, None for the id,
+        # or False when the default sort can't be paged with cursors.
+        order = list(self._get_default_order() or [])
+
+        if not order:
+            return None, False
+        
+        if len(order) > 1 or order[0][1]:
+            return False
+        
+        column, joins, descending = order[0]
+
+        return (None if column.key == 'id' else column), bool(descending)
+    
+    def _keyset_order(self, column, descending: bool) -> list:
+        explicit_nulls = self.session.get_bind().dialect.name \
+                == 'postgresql'
+        order = []
+
+        for key in (column, self.model.id):
+            if key is not None:
+                key = key.desc() if descending else key.asc()
+
+                # PostgreSQL sorts NULLs last in ascending order.
+                if explicit_nulls:
+                    key = key.nulls_last() if descending \
+                            else key.nulls_first()
+                
+                order.append(key)
+        
+        return order
+    
+    def _apply_sorting(self, query, joins, sort_column, sort_desc):
+        if (keyset := g.get('_admin_keyset')) is None:
+            return super()._apply_sorting(query, joins, sort_column,
+                    sort_desc)
+        
+        column, descending, cursor = keyset
+
+        if cursor is not None:
+            query = query.filter(_seek_filter(column, self.model.id, *cursor,
+                    descending))
+        
+        return query.order_by(*self._keyset_order(column, descending)), joins
+    
+    def get_list(self, page, sort_column, sort_desc, search, filters,
+            execute=True, page_size=None):
+        
+        page_size = self.page_size if page_size is None else page_size
+        key = self._get_keyset_column() if self.keyset_pagination \
+                and execute and page_size and sort_column is None \
+                and not page else False
+
+        if key is False:
+            return super().get_list(page, sort_column, sort_desc, search,
+                    filters, execute, page_size)
+        
+        column, descending = key
+        before = request.args.get('before')
+        cursor = before or request.args.get('after')
+        cursor = _decode_cursor(cursor, column) if cursor else None
+        backward = bool(before) and cursor is not None
+
+        # Pages before the cursor are read in reverse order, and one extra
+        # row tells whether there is another page in that direction.
+        g._admin_keyset = (column, descending != backward, cursor)
+
+        try:
+            count, records = super().get_list(0, None, False, search,
+                    filters, True, page_size + 1)
+        finally:
+            g.pop('_admin_keyset', None)
+        
+        has_more = len(records) > page_size
+        records = records[:page_size]
+
+        if backward:
+            records.reverse()
+        
+        view_args = self._get_list_extra_args()
+        extra_args = {name: value for name, value
+                in view_args.extra_args.items()
+                if name not in ('after', 'before')}
+        
+        def cursor_url(name: Optional[str] = None, record=None) -> str:
+            args = dict(extra_args)
+
+            if name is not None:
+                args[name] = _encode_cursor(None if column is None
+                        else getattr(record, column.key), record.id)
+            
+            return self._get_list_url(view_args.clone(page=None,
+                    extra_args=args))
+        
+        g.admin_keyset_urls = {
+            'first': cursor_url() if cursor is not None else None,
+            'previous': cursor_url('before', records[0]) if records
+                    and (has_more if backward else cursor is not None)
+                    else None,
+            'next': cursor_url('after', records[-1]) if records
+                    and (cursor is not None if backward else has_more)
+                    else None,
+        }
+
+        return count, records
+    
+    def get_keyset_urls(self) -> Optional[Dict[str, Optional[str]]]:
+        """Returns the first, previous and next page URLs of a list view
+        paged with cursors, or None when it is paged by number.
+        """
+
+        return g.get('admin_keyset_urls')
+    
+    def get_item_eager_loads(self) -> Tuple[str, ...]:
+        """Returns the relationships loaded with the record of the details,
+        edit and delete views. By default, details_eager_loads.
+        """
+
+        return self.details_eager_loads
+    
+    def get_one(self, id):
+        """Returns the record of id, loaded once per request and shared by
+        the permission checks, Flask-Admin and the form hooks.
+        """
+
+        items = g.setdefault('_admin_items', {})
+        key = (self.endpoint, str(id))
+
+        if key not in items:
+            items[key] = self.session.get(self.model, tools.iterdecode(id),
+                    options=eager_load_options(self.model,
+                        self.get_item_eager_loads()))
+        
+        return items[key]
+    
     def has_create_permission(self) -> bool:
         """Override this method to add create permission checks on a granular
         level. By default, it returns True.
@@ -200,27 +445,65 @@ class AdminModelView(ModelView):
 
         return True
     
+    def get_editable_filter(self):
+        """Override this method to restrict bulk actions to the records the
+        user may edit. It returns a criterion on the model, or None when
+        every record is editable, which is the default.
+        """
+
+        return None
+    
     def delete_model(self, model):
         return self.has_delete_permission(model) \
                 and super().delete_model(model)
     
-    def update_records(self,
-            ids: Iterable,
-            record_editor: Callable[[Any], Tuple[Any, bool]]
-        ) -> Iterable:
-
-        query = self.model.query.filter(self.model.id.in_(ids))
-        updated_records = []
+    def update_records(self, ids: Iterable,
+            values: Dict[str, Any]) -> Dict[int, str]:
+        """Sets values on the records of ids the user may edit, with one
+        query resolving the permitted ids and a single UPDATE committed in
+        one transaction. Returns the outcome of each id: `updated`,
+        `forbidden` or `missing`.
+        """
 
-        for record in query.all():
-            record, is_updated = record_editor(record)
+        ids = {int(record_id) for record_id in ids}
+        criterion = self.get_editable_filter()
+        permitted = true() if criterion is None else criterion
+        found = dict(self.session.execute(select(self.model.id, permitted)\
+                .where(self.model.id.in_(ids))).all())
+        updated_ids = [record_id for record_id, is_permitted in found.items()
+                if is_permitted]
+
+        if updated_ids:
+            self.session.execute(update(self.model)\
+                    .where(self.model.id.in_(updated_ids))\
+                    .values(**values))
+        
+        self.session.commit()
 
-            if is_updated:
-                updated_records.append(record)
+        return {record_id: ('missing' if record_id not in found
+                    else 'updated' if found[record_id] else 'forbidden')
+                for record_id in sorted(ids)}
+    
+    def flash_update_outcomes(self, outcomes: Dict[int, str], verb: str):
+        """Flashes how many records an update_records action changed and the
+        ids of those it skipped.
+        """
 
-        return updated_records
+        count = sum(outcome == 'updated' for outcome in outcomes.values())
+        flash(ngettext(
+            f"Record was successfully {verb}.",
+            f"{count} records were successfully {verb}.",
+            count,
+            count=count,
+        ), 'success')
+
+        for outcome, reason in (('forbidden', 'no permission to edit'),
+                ('missing', 'not found')):
+            if (skipped := [str(record_id) for record_id, value
+                    in outcomes.items() if value == outcome]):
+                flash(gettext('Records were skipped, %(reason)s: %(ids)s',
+                        reason=reason, ids=', '.join(skipped)), 'warning')
 
-    
     @expose('/new/', methods=('GET', 'POST'))
     def create_view(self):
         return_url = get_redirect_target() or self.get_url('.index_view')
@@ -233,10 +516,11 @@ class AdminModelView(ModelView):
     
     @expose('/details/')
     def details_view(self):
-        item_id = int(request.args.get('id', None))
+        item_id = request.args.get('id', None)
+        item = self.get_one(item_id) if item_id else None
         return_url = get_redirect_target() or self.get_url('.index_view')
 
-        if self.has_details_permission(self.model.query.get(item_id)):
+        if self.has_details_permission(item):
             return super().details_view()
         else:
             flash(gettext('User has no permission to view this record.'), 'error')
@@ -244,10 +528,11 @@ class AdminModelView(ModelView):
     
     @expose('/edit/', methods=('GET', 'POST'))
     def edit_view(self):
-        item_id = int(request.args.get('id', None))
+        item_id = request.args.get('id', None)
+        item = self.get_one(item_id) if item_id else None
         return_url = get_redirect_target() or self.get_url('.index_view')
 
-        if self.has_edit_permission(self.model.query.get(item_id)):
+        if self.has_edit_permission(item):
             return super().edit_view()
         else:
             flash(gettext('User has no permission to edit this record.'), 'error')
@@ -258,7 +543,9 @@ class AdminModelView(ModelView):
         form = self.delete_form()
         return_url = get_redirect_target() or self.get_url('.index_view')
 
-        if self.has_delete_permission(self.model.query.get(form.id.data)):
+        item = self.get_one(form.id.data) if form.id.data else None
+
+        if self.has_delete_permission(item):
             return super().delete_view()
         else:
             flash(gettext('User has no permission to delete this record.'), 'error')
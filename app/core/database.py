@@ -1,17 +1,23 @@
 from datetime import datetime
-from typing import Union
+from typing import (
+    Optional,
+    Union,
+)
 import uuid as uuid_module
 
 from sqlalchemy import (
     ForeignKey,
     DateTime,
     Integer,
+    Table,
     Uuid,
+    text,
 )
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
+    Session,
     mapped_column,
 )
 from sqlalchemy_utils import ChoiceType as BaseChoiceType
@@ -20,6 +26,40 @@ from sqlalchemy_utils import ChoiceType as BaseChoiceType
 _EMPTY_CHOICE = (('none', 'None'),)
 
 
+def estimate_row_count(session: Session, table: Table) -> Optional[int]:
+    """Returns the number of rows of table according to the statistics kept
+    by the database, or None when there are none. The estimate is only as
+    fresh as the last ANALYZE of the table.
+    """
+
+    connection = session.connection()
+    dialect = connection.dialect.name
+
+    if dialect in ('mysql', 'mariadb'):
+        estimate = connection.scalar(text(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = :name"),
+                {'name': table.name})
+    elif dialect == 'postgresql':
+        estimate = connection.scalar(text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:name)"), {'name': table.name})
+    elif dialect == 'sqlite':
+        if not connection.scalar(text("SELECT count(*) FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'")):
+            return None
+
+        # The first number of a stat row is the row count of the table.
+        stat = connection.scalar(text("SELECT stat FROM sqlite_stat1 "
+                "WHERE tbl = :name LIMIT 1"), {'name': table.name})
+        estimate = int(stat.split()[0]) if stat else None
+    else:
+        return None
+
+    # PostgreSQL reports -1 for tables that were never analyzed.
+    return int(estimate) if estimate is not None and estimate >= 0 else None
+
+
 class ChoiceType(BaseChoiceType):
     """Based from sqlalchemy_utils.ChoiceType, this column type is compatible
     with Flask Migrate script generation, unlike the former.
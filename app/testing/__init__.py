@@ -0,0 +1,8 @@
+from .factory import (
+    count_statements,
+    create_test_app,
+)
+from .seed import (
+    seed,
+    seed_content,
+)
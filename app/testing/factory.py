@@ -0,0 +1,71 @@
+"""App factory and helpers shared by the tests and the benchmarks.
+
+The app runs against its own database, an in-memory SQLite one by default,
+and never against the one configured for the site.
+"""
+
+from contextlib import contextmanager
+from os import environ
+from typing import (
+    Dict,
+    Iterator,
+    Optional,
+)
+
+from flask import Flask
+from redis import Redis
+from sqlalchemy import event
+
+
+_REQUIRED_CONFIG = {
+    'SECRET_KEY': 'testing',
+    'SECURITY_PASSWORD_HASH': 'bcrypt',
+    'SECURITY_PASSWORD_SALT': 'testing',
+    'WTF_CSRF_SECRET_KEY': 'testing',
+}
+
+
+def create_test_app(database_uri: str = 'sqlite://',
+        acl_redis: Optional[Redis] = None) -> Flask:
+    """Creates the Flask app on the database at database_uri, a fresh one by
+    default, with every table and the default access nodes, roles and groups
+    in place. The shared ACL cache uses acl_redis when given.
+    """
+
+    for key, value in _REQUIRED_CONFIG.items():
+        environ.setdefault(key, value)
+
+    environ['DB_URI'] = database_uri
+    environ.pop('SUSER_USERNAME', None)
+
+    from .. import (
+        auth,
+        base,
+        create_app,
+    )
+    from ..extensions import db
+
+    app = create_app(acl_redis=acl_redis)
+
+    with app.app_context():
+        db.create_all()
+        auth.prepare_blueprint()
+        base.prepare_blueprint()
+
+    return app
+
+@contextmanager
+def count_statements(engine) -> Iterator[Dict[str, int]]:
+    """Counts the SQL statements executed on engine within the block."""
+
+    counter = {'statements': 0}
+
+    def on_execute(*args, **kwargs):
+        counter['statements'] += 1
+
+    event.listen(engine, 'before_cursor_execute', on_execute)
+
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
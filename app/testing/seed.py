@@ -0,0 +1,243 @@
+"""Seeds synthetic users, groups, content and grants for tests and
+benchmarks.
+
+Rows are written with bulk inserts, so ORM flush hooks don't run for them.
+"""
+
+from random import Random
+from typing import (
+    Dict,
+    List,
+)
+from uuid import uuid4
+
+from sqlalchemy import (
+    func,
+    insert,
+    select,
+)
+
+
+def seed(users: int = 200, groups: int = 20, memberships: int = 3,
+        posts: int = 5000, unique_ratio: float = 0.5,
+        user_grants: int = 2000, group_grants: int = 2000,
+        roles: int = 0, super_users: int = 0,
+        random_seed: int = 0) -> Dict[str, List[int]]:
+    """Seeds the database of the current app context and returns the ids
+    of the created users, groups, roles, bulletin posts and access nodes.
+
+    Grants use the Reader, Contributor and Editor roles plus `roles` extra
+    roles with random permissions. The first `super_users` users are given
+    the Super User role on the `auth` access node.
+    """
+
+    from ..auth.constants import (
+        ANONYMOUS,
+        AUTHENTICATED,
+        CONTRIBUTOR,
+        EDITOR,
+        READER,
+        SUPER_USER,
+        Permission,
+    )
+    from ..auth.models import (
+        AccessNode,
+        Group,
+        GroupAccess,
+        Role,
+        User,
+        UserAccess,
+        UsersOnGroups,
+    )
+    from ..base.models import BulletinPost
+    from ..extensions import db
+
+    rng = Random(random_seed)
+    session = db.session
+    users_node = AccessNode.get_by_full_name(User.access_node_full_name)
+    posts_node = AccessNode.get_by_full_name(
+            BulletinPost.access_node_full_name)
+    
+    session.execute(insert(User), [
+        {
+            'username': f"bench-user-{i}",
+            'email': f"bench-user-{i}@example.com",
+            'password': 'benchmark',
+            'fs_uniquifier': uuid4().hex,
+            'active': True,
+            'access_node_id': users_node.id,
+        }
+        for i in range(users)
+    ])
+    session.execute(insert(Group), [
+        {
+            'name': f"bench-group-{i}",
+            'access_node_id': AccessNode.get_by_full_name(
+                    Group.access_node_full_name).id,
+        }
+        for i in range(groups)
+    ])
+    user_ids = list(session.scalars(select(User.id)
+            .where(User.username.startswith('bench-user-'))))
+    group_ids = list(session.scalars(select(Group.id)
+            .where(Group.name.startswith('bench-group-'))))
+    
+    if group_ids and memberships:
+        session.execute(insert(UsersOnGroups), [
+            {'user_id': user_id, 'group_id': group_id}
+            for user_id in user_ids
+            for group_id in rng.sample(group_ids,
+                    min(memberships, len(group_ids)))
+        ])
+
+    unique_names = [str(uuid4()) for _ in range(int(posts * unique_ratio))]
+
+    if unique_names:
+        session.execute(insert(AccessNode), [
+            {
+                'name': name,
+                'parent_id': posts_node.id,
+                'path': f"{posts_node.path}.{name}",
+            }
+            for name in unique_names
+        ])
+    
+    node_ids = dict(session.execute(select(AccessNode.name, AccessNode.id)
+            .where(AccessNode.parent_id == posts_node.id)).all())
+    unique_node_ids = [node_ids[name] for name in unique_names]
+    post_node_ids = unique_node_ids \
+            + [posts_node.id] * (posts - len(unique_node_ids))
+    rng.shuffle(post_node_ids)
+    
+    session.execute(insert(BulletinPost), [
+        {
+            'title': f"Bench Post {i}",
+            'content': f"Benchmark content {i}",
+            'display': ['content'],
+            'access_node_id': node_id,
+        }
+        for i, node_id in enumerate(post_node_ids)
+    ])
+
+    if roles:
+        session.execute(insert(Role), [
+            {
+                'name': f"bench-role-{i}",
+                'permissions': sorted(rng.sample(Permission.names()[1:],
+                        rng.randint(1, 4))),
+                'access_node_id': AccessNode.get_by_full_name(
+                        Role.access_node_full_name).id,
+            }
+            for i in range(roles)
+        ])
+        Role.rebuild_permission_masks()
+
+    role_ids = [Role.get_by_name(name).id
+            for name in (READER, CONTRIBUTOR, EDITOR)]
+    role_ids += list(session.scalars(select(Role.id)
+            .where(Role.name.startswith('bench-role-'))))
+    grant_node_ids = unique_node_ids + [posts_node.id]
+    
+    def sample_grants(subject_ids: List[int], count: int) -> set:
+        grants = set()
+
+        for _ in range(count * 2):
+            if len(grants) >= count:
+                break
+
+            grants.add((rng.choice(grant_node_ids), rng.choice(subject_ids),
+                    rng.choice(role_ids)))
+            
+        return grants
+
+    if user_ids and user_grants:
+        session.execute(insert(UserAccess), [
+            {'access_id': node_id, 'user_id': user_id, 'role_id': role_id}
+            for node_id, user_id, role_id in
+                    sample_grants(user_ids, user_grants)
+        ])
+
+    if super_users:
+        session.execute(insert(UserAccess), [
+            {
+                'access_id': AccessNode.get_by_full_name('auth').id,
+                'user_id': user_id,
+                'role_id': Role.get_by_name(SUPER_USER).id,
+            }
+            for user_id in user_ids[:super_users]
+        ])
+
+    builtin_ids = [Group.get_by_name(ANONYMOUS).id,
+            Group.get_by_name(AUTHENTICATED).id]
+    
+    if group_grants:
+        session.execute(insert(GroupAccess), [
+            {'access_id': node_id, 'group_id': group_id, 'role_id': role_id}
+            for node_id, group_id, role_id in
+                    sample_grants(group_ids + builtin_ids, group_grants)
+        ])
+
+    session.commit()
+
+    return {
+        'users': user_ids,
+        'groups': group_ids,
+        'roles': role_ids,
+        'posts': list(session.scalars(select(BulletinPost.id))),
+        'access_nodes': grant_node_ids,
+    }
+
+def seed_content(people: int, user_ids, random_seed: int = 0):
+    """Seeds people, preachings by them and prayer requests they pray for,
+    written by the given users.
+    """
+
+    from ..auth.models import AccessNode
+    from ..base.models import (
+        PeopleOnPrayerRequests,
+        Person,
+        PrayerRequest,
+        Preaching,
+    )
+    from ..extensions import db
+
+    rng = Random(random_seed)
+    session = db.session
+
+    # prepare_blueprint doesn't create the access node of prayer requests.
+    if AccessNode.get_by_full_name(PrayerRequest.access_node_full_name) \
+            is None:
+        AccessNode.create_by_full_name(PrayerRequest.access_node_full_name)
+        session.flush()
+
+    def writers():
+        return {'created_by_id': rng.choice(user_ids),
+                'updated_by_id': rng.choice(user_ids)}
+
+    session.execute(insert(Person), [
+        {'first_name': f"Bench{i}", 'last_name': 'Person', **writers()}
+        for i in range(people)
+    ])
+    person_ids = list(session.scalars(select(Person.id)
+            .where(Person.first_name.startswith('Bench'))))
+
+    session.execute(insert(Preaching), [
+        {'title': f"Bench Preaching {i}",
+                'preacher_id': rng.choice(person_ids), **writers()}
+        for i in range(people)
+    ])
+    last_request_id = session.scalar(select(func.max(PrayerRequest.id))) or 0
+    session.execute(insert(PrayerRequest), [
+        {'title': f"Bench Prayer Request {i}", 'status': 'praying',
+                **writers()}
+        for i in range(people)
+    ])
+    request_ids = list(session.scalars(select(PrayerRequest.id)
+            .where(PrayerRequest.id > last_request_id)))
+
+    session.execute(insert(PeopleOnPrayerRequests), [
+        {'person_id': person_id, 'prayer_request_id': request_id}
+        for request_id in request_ids
+        for person_id in rng.sample(person_ids, min(3, len(person_ids)))
+    ])
+    session.commit()
@@ -0,0 +1,149 @@
+"""Measures how the ACL layer scales with the amount of ACL data.
+
+Times has_user_permissions, has_group_permissions, authorized_query().count()
+and a page of authorized_query for an anonymous, an ordinary and a super
+user, and writes the latency percentiles and statement counts as JSON.
+
+Usage:
+    python -m benchmarks.acl_scaling --users 1000 --posts 20000 \\
+            --output acl-scaling.json
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime
+from itertools import cycle
+import json
+from random import Random
+import sys
+
+from app.testing import (
+    create_test_app,
+    seed,
+)
+
+from .common import measure
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--engine', default=None,
+            help='ACL query engine, ACL_QUERY_ENGINE by default.')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--memberships', type=int, default=3)
+    parser.add_argument('--roles', type=int, default=0,
+            help='Roles created in addition to the default ones.')
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--unique-ratio', type=float, default=0.5,
+            help='Share of posts with their own access node.')
+    parser.add_argument('--user-grants', type=int, default=2000)
+    parser.add_argument('--group-grants', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--random-seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+            help='File to write the results to, stdout by default.')
+    args = parser.parse_args()
+
+    app = create_test_app(args.database_uri)
+
+    if args.engine:
+        app.config['ACL_QUERY_ENGINE'] = args.engine
+
+    from flask_login import AnonymousUserMixin
+
+    from app.auth import (
+        cache as acl_cache,
+        effective,
+    )
+    from app.auth.constants import Permission
+    from app.auth.models import (
+        AccessNode,
+        Group,
+        User,
+    )
+    from app.base.models import BulletinPost
+    from app.extensions import db
+
+    with app.app_context():
+        seeded = seed(users=args.users, groups=args.groups,
+                memberships=args.memberships, posts=args.posts,
+                unique_ratio=args.unique_ratio, user_grants=args.user_grants,
+                group_grants=args.group_grants, roles=args.roles,
+                super_users=1, random_seed=args.random_seed)
+        
+        # Seeded rows bypass the flush hooks that maintain the effective
+        # permission tables.
+        if effective.is_enabled():
+            effective.rebuild(db.session.connection())
+            db.session.commit()
+
+        database = db.engine.dialect.name
+
+    rng = Random(args.random_seed)
+    results = {}
+
+    with app.test_request_context():
+        identities = {
+            'anonymous': AnonymousUserMixin(),
+            'ordinary': db.session.get(User, seeded['users'][-1]),
+            'super': db.session.get(User, seeded['users'][0]),
+        }
+        nodes = cycle(db.session.get(AccessNode, node_id)
+                for node_id in rng.sample(seeded['access_nodes'],
+                    min(args.repeat, len(seeded['access_nodes']))))
+        groups = cycle(db.session.get(Group, group_id)
+                for group_id in seeded['groups'])
+
+        def uncached(func):
+            # Decisions are memoized per request; drop them so that every
+            # call is measured cold. Process-wide indexes stay warm.
+            def call():
+                acl_cache.clear()
+                return func()
+
+            return call
+
+        results['has_group_permissions'] = measure(db.engine,
+                uncached(lambda: next(nodes).has_group_permissions(
+                    next(groups), Permission.READ_RECORD)),
+                args.repeat)
+
+        for identity, user in identities.items():
+            def query():
+                return BulletinPost.authorized_query(user=user)
+
+            results[identity] = {
+                'has_user_permissions': measure(db.engine,
+                        uncached(lambda: next(nodes).has_user_permissions(
+                            user, Permission.READ_RECORD)),
+                        args.repeat),
+                'count': measure(db.engine,
+                        uncached(lambda: query().count()), args.repeat),
+                'page': measure(db.engine,
+                        uncached(lambda: query()\
+                            .order_by(BulletinPost.created_at.desc())\
+                            .offset(args.page_size)\
+                            .limit(args.page_size).all()),
+                        args.repeat),
+                'rows': query().count(),
+            }
+
+    output = json.dumps({
+        'created_at': datetime.utcnow().isoformat(),
+        'database': database,
+        'engine': app.config['ACL_QUERY_ENGINE'],
+        'parameters': vars(args),
+        'results': results,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Measures the streamed CSV and JSON exports of the bulletin posts admin
+view for a super user and an ordinary user.
+
+Reports the time to the first chunk, the total time, the size of the
+export and the peak memory allocated while streaming it, which should not
+grow with the number of posts.
+
+Usage:
+    python -m benchmarks.admin_export --posts 500000 --output export.json
+"""
+
+from argparse import ArgumentParser
+import json
+import sys
+from time import perf_counter
+import tracemalloc
+
+from app.testing import (
+    count_statements,
+    create_test_app,
+    seed,
+)
+
+
+def stream(client, url: str) -> dict:
+    """Reads the export at url chunk by chunk and returns its figures."""
+
+    tracemalloc.start()
+    start = perf_counter()
+    response = client.get(url, buffered=False)
+    first_chunk_ms = None
+    size = 0
+
+    for chunk in response.response:
+        if first_chunk_ms is None:
+            first_chunk_ms = (perf_counter() - start) * 1000
+
+        size += len(chunk)
+
+    total_ms = (perf_counter() - start) * 1000
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'first_chunk_ms': round(first_chunk_ms or total_ms, 3),
+        'total_ms': round(total_ms, 3),
+        'bytes': size,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--unique-ratio', type=float, default=0.01,
+            help='Share of posts with their own access node.')
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--output', default=None,
+            help='File to write the results to, stdout by default.')
+    args = parser.parse_args()
+
+    app = create_test_app(args.database_uri)
+
+    from app.auth.models import User
+    from app.base.models import BulletinPost
+    from app.extensions import (
+        admin,
+        db,
+    )
+
+    with app.app_context():
+        seeded = seed(users=args.users, groups=5, posts=args.posts,
+                unique_ratio=args.unique_ratio, user_grants=args.users,
+                group_grants=args.users, super_users=1)
+        engine = db.engine
+        identities = {
+            'super': db.session.get(User, seeded['users'][0]).fs_uniquifier,
+            'ordinary': db.session.get(User, seeded['users'][-1])\
+                    .fs_uniquifier,
+        }
+
+    view = next(view for view in admin._views
+            if getattr(view, 'model', None) is BulletinPost)
+
+    if args.chunk_size:
+        view.export_chunk_size = args.chunk_size
+
+    results = {}
+
+    for identity, fs_uniquifier in identities.items():
+        client = app.test_client()
+
+        with client.session_transaction() as session:
+            session['_user_id'] = fs_uniquifier
+            session['_fresh'] = True
+
+        for export_type in view.export_types:
+            with count_statements(engine) as counter:
+                result = stream(client, f"{view.url}/export/{export_type}/")
+
+            results[f"{identity}_{export_type}"] = {**result, **counter}
+
+    output = json.dumps({
+        'database': engine.dialect.name,
+        'parameters': vars(args),
+        'results': results,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
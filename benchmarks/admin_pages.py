@@ -0,0 +1,111 @@
+"""Counts the statements and measures the latency of the admin list,
+details and edit pages of a super user, with relationships filled in so
+that lazy loads show up.
+
+Exits with status 1 when a page executes more statements than
+--max-statements, so that the eager-loading profiles of the views can be
+checked from CI.
+
+Usage:
+    python -m benchmarks.admin_pages --people 200 --max-statements 12
+"""
+
+from argparse import ArgumentParser
+import json
+import sys
+
+from app.testing import (
+    create_test_app,
+    seed,
+    seed_content,
+)
+
+from .common import measure
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--people', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--max-statements', type=int, default=None)
+    parser.add_argument('--output', default=None,
+            help='File to write the results to, stdout by default.')
+    args = parser.parse_args()
+
+    app = create_test_app(args.database_uri)
+
+    from app.auth.models import User
+    from app.extensions import (
+        admin,
+        db,
+    )
+
+    with app.app_context():
+        seeded = seed(users=args.users, groups=5, posts=args.people,
+                user_grants=args.users, group_grants=args.users,
+                super_users=1)
+        seed_content(args.people, seeded['users'])
+        engine = db.engine
+        super_user = db.session.get(User, seeded['users'][0])
+        fs_uniquifier = super_user.fs_uniquifier
+        pages = []
+
+        for view in admin._views:
+            model = getattr(view, 'model', None)
+
+            if model is None:
+                continue
+
+            pages.append(f"{view.url}/")
+            first_id = db.session.scalar(db.select(model.id)
+                    .order_by(model.id).limit(1))
+
+            if first_id is not None and view.can_view_details:
+                pages.append(f"{view.url}/details/?id={first_id}")
+
+            if first_id is not None and view.can_edit:
+                pages.append(f"{view.url}/edit/?id={first_id}")
+
+    client = app.test_client()
+
+    with client.session_transaction() as session:
+        session['_user_id'] = fs_uniquifier
+        session['_fresh'] = True
+
+    results = {}
+    over_limit = []
+
+    for page in pages:
+        status = client.get(page).status_code
+
+        if status != 200:
+            results[page] = {'status': status}
+            continue
+
+        results[page] = measure(engine, lambda: client.get(page), args.repeat)
+
+        if args.max_statements is not None \
+                and results[page]['statements'] > args.max_statements:
+            over_limit.append(page)
+
+    output = json.dumps({
+        'database': engine.dialect.name,
+        'parameters': vars(args),
+        'results': results,
+        'over_limit': over_limit,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+    if over_limit:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
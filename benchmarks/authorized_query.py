@@ -0,0 +1,69 @@
+"""Compares the `join` and `exists` engines of authorized_query.
+
+Usage:
+    python -m benchmarks.authorized_query --posts 5000 --grants 5000
+"""
+
+from argparse import ArgumentParser
+import json
+
+from app.testing import (
+    create_test_app,
+    seed,
+)
+
+from .common import measure
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--grants', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_test_app(args.database_uri)
+
+    from flask_login import AnonymousUserMixin
+
+    from app.auth.models import User
+    from app.base.models import BulletinPost
+    from app.extensions import db
+
+    with app.app_context():
+        seeded = seed(users=args.users, groups=args.groups,
+                posts=args.posts, user_grants=args.grants,
+                group_grants=args.grants)
+        
+    results = {}
+
+    with app.test_request_context():
+        identities = {
+            'anonymous': AnonymousUserMixin(),
+            'member': db.session.get(User, seeded['users'][0]),
+        }
+
+        for identity, user in identities.items():
+            for engine in ('join', 'exists'):
+                def query():
+                    return BulletinPost.authorized_query(user=user,
+                            engine=engine)
+                
+                results[f"{identity}.{engine}.page"] = measure(db.engine,
+                        lambda: query()\
+                            .order_by(BulletinPost.created_at.desc())\
+                            .limit(12).all(),
+                        args.repeat)
+                results[f"{identity}.{engine}.count"] = measure(db.engine,
+                        lambda: query().count(), args.repeat)
+                results[f"{identity}.{engine}.count"]['rows'] = \
+                        query().count()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
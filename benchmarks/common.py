@@ -0,0 +1,60 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against their own database, created with
+app.testing.create_test_app, and never against the one configured for the
+site.
+"""
+
+from statistics import quantiles
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+)
+
+from sqlalchemy.sql import Executable
+
+from app.testing import count_statements
+
+
+def measure(engine, func: Callable[[], Any], repeat: int = 20
+        ) -> Dict[str, float]:
+    """Calls func repeat times and returns its latency percentiles in
+    milliseconds along with the statements it executes per call.
+    """
+
+    func()
+    samples: List[float] = []
+
+    with count_statements(engine) as counter:
+        for _ in range(repeat):
+            start = perf_counter()
+            func()
+            samples.append((perf_counter() - start) * 1000)
+
+    cuts = quantiles(samples, n=100, method='inclusive') \
+            if len(samples) > 1 else samples * 99
+    
+    return {
+        'p50_ms': round(cuts[49], 3),
+        'p90_ms': round(cuts[89], 3),
+        'p99_ms': round(cuts[98], 3),
+        'max_ms': round(max(samples), 3),
+        'statements': counter['statements'] / repeat,
+    }
+
+def explain(engine, statement: Executable) -> List[str]:
+    """Returns the query plan of statement, as EXPLAIN QUERY PLAN on SQLite
+    and EXPLAIN elsewhere, one line per row.
+    """
+
+    prefix = 'EXPLAIN QUERY PLAN ' if engine.dialect.name == 'sqlite' \
+            else 'EXPLAIN '
+    sql = str(statement.compile(engine,
+            compile_kwargs={'literal_binds': True}))
+
+    with engine.connect() as connection:
+        return [' | '.join(str(value) for value in row)
+                for row in connection.exec_driver_sql(prefix + sql)]
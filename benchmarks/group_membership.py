@@ -0,0 +1,110 @@
+"""Compares group membership expressed as a correlated subquery with the
+cached literal IN list used by the ACL filters.
+
+Usage:
+    python -m benchmarks.group_membership --groups 200 --memberships 100
+"""
+
+from argparse import ArgumentParser
+import json
+
+from app.testing import (
+    create_test_app,
+    seed,
+)
+
+from .common import (
+    explain,
+    measure,
+)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--memberships', type=int, default=100)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--grants', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_test_app(args.database_uri)
+
+    from sqlalchemy import select
+
+    from app.auth.constants import (
+        AUTHENTICATED,
+        Permission,
+    )
+    from app.auth.indexes import role_index
+    from app.auth.models import (
+        Group,
+        GroupAccess,
+        User,
+        UserAccess,
+        user_group_ids,
+    )
+    from app.base.models import BulletinPost
+    from app.extensions import db
+
+    with app.app_context():
+        seeded = seed(users=args.users, groups=args.groups,
+                memberships=args.memberships, posts=args.posts,
+                user_grants=args.grants, group_grants=args.grants)
+    
+    results = {}
+
+    with app.test_request_context():
+        user = db.session.get(User, seeded['users'][0])
+        role_ids = role_index.role_ids(Permission.READ_RECORD)
+
+        # The membership filter the ACL queries used before group ids were
+        # cached, in the shape of the `exists` engine.
+        def subquery():
+            group_filter = GroupAccess.group.has(
+                    Group.users.any(User.id == user.id)
+                    | (Group.name == AUTHENTICATED))
+            
+            return BulletinPost.query.filter(
+                select(GroupAccess.id)\
+                    .where((GroupAccess.access_id
+                            == BulletinPost.access_node_id) \
+                        & group_filter & GroupAccess.role_id.in_(role_ids))\
+                    .exists()
+                | select(UserAccess.id)\
+                    .where((UserAccess.access_id
+                            == BulletinPost.access_node_id) \
+                        & (UserAccess.user_id == user.id) \
+                        & UserAccess.role_id.in_(role_ids))\
+                    .exists())
+        
+        variants = {
+            'subquery': subquery,
+            'exists': lambda: BulletinPost.authorized_query(user=user,
+                    engine='exists'),
+            'join': lambda: BulletinPost.authorized_query(user=user,
+                    engine='join'),
+        }
+
+        for name, variant in variants.items():
+            results[name] = {
+                'page': measure(db.engine,
+                        lambda: variant()\
+                            .order_by(BulletinPost.created_at.desc())\
+                            .limit(12).all(),
+                        args.repeat),
+                'count': measure(db.engine, lambda: variant().count(),
+                        args.repeat),
+                'rows': variant().count(),
+                'plan': explain(db.engine, variant().statement),
+            }
+
+        results['groups_per_user'] = len(user_group_ids(user))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -35,6 +35,14 @@ class Config:
     SUSER_EMAIL = environ.get('SUSER_EMAIL', None)
     SUSER_USERNAME = environ.get('SUSER_USERNAME', None)
     SUSER_PASSWORD = environ.get('SUSER_PASSWORD', None)
+    # One of `exists`, `join` or `effective`. Run `flask auth
+    # rebuild-permissions` before switching to `effective`.
+    ACL_QUERY_ENGINE = environ.get('ACL_QUERY_ENGINE', 'exists')
+    ACL_SHARED_CACHE_TTL = int(environ.get('ACL_SHARED_CACHE_TTL', 300))
+    ACL_SUPER_USER_TTL = int(environ.get('ACL_SUPER_USER_TTL', 60))
+    ACL_ROLE_INDEX_TTL = int(environ.get('ACL_ROLE_INDEX_TTL', 60))
+    ACL_PUBLIC_NODE_TTL = int(environ.get('ACL_PUBLIC_NODE_TTL', 60))
+    ACL_NODE_REGISTRY_TTL = int(environ.get('ACL_NODE_REGISTRY_TTL', 60))
 
 
 class Production(Config):
@@ -0,0 +1,44 @@
+import pytest
+from redislite import Redis
+
+from app.auth.shared_cache import shared_cache
+from app.testing import create_test_app
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The app on an in-memory SQLite database with the default access
+    nodes, roles and groups, shared by every test.
+    """
+
+    app = create_test_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    return app
+
+@pytest.fixture
+def app_context(app):
+    """An app context for the test. Requests of a test client must be made
+    outside of it, or they would share its database session.
+    """
+
+    with app.app_context():
+        yield
+
+@pytest.fixture(scope='module')
+def redis(tmp_path_factory):
+    """A Redis server of its own for the test module."""
+
+    server = Redis(str(tmp_path_factory.mktemp('redis') / 'acl.rdb'))
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def shared_app(app, redis, monkeypatch):
+    """The app using an emptied Redis server for its shared ACL cache."""
+
+    monkeypatch.setitem(app.extensions, 'acl_shared_cache', redis)
+    monkeypatch.setattr(shared_cache, '_down_until', 0.0)
+    redis.flushdb()
+
+    return app
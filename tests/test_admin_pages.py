@@ -0,0 +1,159 @@
+import pytest
+from sqlalchemy import text
+
+from app.auth.models import User
+from app.base.models import Preaching
+from app.core.database import estimate_row_count
+from app.extensions import (
+    admin,
+    db,
+)
+from app.testing import (
+    count_statements,
+    seed,
+    seed_content,
+)
+
+
+# Session, user and ACL lookups, then the records with their eager loads.
+MAX_STATEMENTS = 8
+
+STATEMENT_BUDGETS = {
+    '/admin/accessnode/details/': 9,
+    # The inline grant forms list the users, groups and roles to choose from.
+    '/admin/accessnode/edit/': 15,
+    '/admin/bulletinpost/edit/': 9,
+    '/admin/group/edit/': 10,
+    # Lists estimating their count read the table statistics first.
+    '/admin/person/': 9,
+    '/admin/person/edit/': 9,
+    '/admin/prayerrequest/edit/': 10,
+    '/admin/preaching/': 9,
+    '/admin/preaching/edit/': 9,
+    '/admin/user/edit/': 10,
+}
+
+
+@pytest.fixture(scope='module')
+def seeded(app):
+    with app.app_context():
+        return seed(users=20, groups=3, posts=10, user_grants=20,
+                group_grants=20, super_users=1)
+
+@pytest.fixture(scope='module')
+def client(app, seeded):
+    client = app.test_client()
+
+    with app.app_context():
+        fs_uniquifier = db.session.get(User, seeded['users'][0])\
+                .fs_uniquifier
+
+    with client.session_transaction() as session:
+        session['_user_id'] = fs_uniquifier
+        session['_fresh'] = True
+
+    return client
+
+def _pages(app):
+    pages = []
+
+    for view in admin._views:
+        model = getattr(view, 'model', None)
+
+        if model is None:
+            continue
+
+        pages.append((f"{view.url}/", ''))
+
+        # The latest record, which is never the user making the requests.
+        with app.app_context():
+            last_id = db.session.scalar(db.select(model.id)
+                    .order_by(model.id.desc()).limit(1))
+
+        if last_id is not None and view.can_view_details:
+            pages.append((f"{view.url}/details/", f"?id={last_id}"))
+
+        if last_id is not None and view.can_edit:
+            pages.append((f"{view.url}/edit/", f"?id={last_id}"))
+
+    return pages
+
+def _statements(app, client):
+    counts = {}
+
+    with app.app_context():
+        engine = db.engine
+
+    for page, args in _pages(app):
+        # The first request warms the process-wide ACL indexes.
+        assert client.get(page + args).status_code == 200, page
+
+        with count_statements(engine) as counter:
+            client.get(page + args)
+
+        counts[page] = counter['statements']
+
+    return counts
+
+
+def test_admin_pages_run_a_bounded_number_of_statements(app, client,
+        seeded):
+
+    with app.app_context():
+        seed_content(3, seeded['users'])
+
+    few = _statements(app, client)
+
+    # Full pages of records with their relationships filled in.
+    with app.app_context():
+        seed_content(60, seeded['users'])
+
+    many = _statements(app, client)
+
+    common = few.keys() & many.keys()
+    
+    assert {page: many[page] for page in common} \
+            == {page: few[page] for page in common}
+    assert {page: count for page, count in many.items()
+            if count > STATEMENT_BUDGETS.get(page, MAX_STATEMENTS)} == {}
+
+def test_large_lists_show_estimated_counts(app, client, seeded,
+        monkeypatch):
+    view = next(view for view in admin._views
+            if getattr(view, 'model', None) is Preaching)
+    monkeypatch.setattr(view, 'count_estimate_threshold', 1)
+
+    with app.app_context():
+        seed_content(3, seeded['users'], random_seed=1)
+        db.session.execute(text('ANALYZE'))
+        # Written after the statistics, which no longer match the table.
+        seed_content(3, seeded['users'], random_seed=2)
+        db.session.commit()
+        estimate = estimate_row_count(db.session, Preaching.__table__)
+        exact = db.session.query(Preaching).count()
+
+    try:
+        assert 1 < estimate < exact
+
+        page = client.get(f"{view.url}/").get_data(as_text=True)
+
+        assert f"List ({estimate})" in page
+        assert 'Exact Count' in page
+        assert f'href="{view.url}/?exact_count=1"' in page
+
+        page = client.get(f"{view.url}/?exact_count=1")\
+                .get_data(as_text=True)
+
+        assert f"List ({exact})" in page
+        assert 'Exact Count' not in page
+
+        # The statistics know nothing of searches.
+        page = client.get(f"{view.url}/?search=Preaching")\
+                .get_data(as_text=True)
+
+        assert f"List ({exact})" in page
+        assert 'Exact Count' not in page
+    finally:
+        with app.app_context():
+            db.session.execute(text('DROP TABLE sqlite_stat1'))
+            db.session.commit()
@@ -0,0 +1,54 @@
+from flask import g
+
+from app.auth import cache as acl_cache
+from app.auth.constants import (
+    EDITOR,
+    Permission,
+)
+from app.auth.models import (
+    AccessNode,
+    Role,
+    User,
+    UserAccess,
+)
+from app.extensions import db
+from app.testing import count_statements
+
+
+def test_repeated_checks_hit_the_request_cache(app, app_context):
+    node = AccessNode.get_by_full_name('base.site_pages')
+    user = User.create_instance(username='cached', email='cached@example.com',
+            password='password', active=True)
+    db.session.add(UserAccess(access=node, user=user,
+            role=Role.get_by_name(EDITOR)))
+    db.session.commit()
+
+    with app.test_request_context():
+        # Loads the user, their groups and the indexes, so that only the
+        # decision itself is counted below.
+        assert node.has_user_permissions(user, Permission.READ_RECORD)
+
+        before = acl_cache.stats()
+
+        with count_statements(db.engine) as first:
+            assert node.has_user_permissions(user, Permission.EDIT_RECORD)
+
+        missed = acl_cache.stats()
+
+        with count_statements(db.engine) as repeated:
+            for _ in range(3):
+                assert node.has_user_permissions(user,
+                        Permission.EDIT_RECORD)
+
+            assert AccessNode.permitted_ids([node.id], user,
+                    Permission.EDIT_RECORD) == {node.id}
+
+        assert first['statements'] == 1
+        assert repeated['statements'] == 0
+        assert missed['misses'] == before['misses'] + 1
+        assert acl_cache.stats() == {'hits': missed['hits'] + 4,
+                'misses': missed['misses']}
+
+    # The app context outlives the request, the cache doesn't.
+    assert '_acl_cache' not in g
+    assert acl_cache.stats() == {'hits': 0, 'misses': 0}
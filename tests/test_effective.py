@@ -0,0 +1,69 @@
+from app.auth import (
+    cache as acl_cache,
+    effective,
+)
+from app.auth.constants import (
+    EDITOR,
+    Permission,
+)
+from app.auth.models import (
+    AccessNode,
+    Group,
+    GroupAccess,
+    Role,
+    User,
+    UserAccess,
+)
+from app.extensions import db
+
+
+def _can_edit(node: AccessNode, user: User) -> bool:
+    acl_cache.clear()
+    return node.has_user_permissions(user, Permission.EDIT_RECORD)
+
+def _assert_consistent():
+    assert not any(effective.check(db.session.connection()).values())
+
+
+def test_deleting_users_and_groups_drops_their_effective_permissions(app,
+        app_context):
+    engine = app.config['ACL_QUERY_ENGINE']
+    app.config['ACL_QUERY_ENGINE'] = 'effective'
+
+    try:
+        with app.test_request_context():
+            effective.rebuild(db.session.connection())
+            editor = Role.get_by_name(EDITOR)
+            node = AccessNode.get_by_full_name('base.site_pages')
+            member = User.create_instance(username='member',
+                    email='member@example.com', password='password',
+                    active=True)
+            granted = User.create_instance(username='granted',
+                    email='granted@example.com', password='password',
+                    active=True)
+            group = Group(name='Deleted Group')
+            group.users.append(member)
+            group.users.append(granted)
+            db.session.add_all([
+                group,
+                GroupAccess(access=node, group=group, role=editor),
+                UserAccess(access=node, user=granted, role=editor),
+            ])
+            db.session.commit()
+
+            _assert_consistent()
+            assert _can_edit(node, member)
+
+            db.session.delete(group)
+            db.session.commit()
+
+            _assert_consistent()
+            assert not _can_edit(node, member)
+            assert _can_edit(node, granted)
+
+            db.session.delete(granted)
+            db.session.commit()
+
+            _assert_consistent()
+    finally:
+        app.config['ACL_QUERY_ENGINE'] = engine
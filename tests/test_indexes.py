@@ -0,0 +1,91 @@
+from time import monotonic
+from uuid import uuid4
+
+from sqlalchemy import (
+    insert,
+    update,
+)
+
+from app.auth import indexes
+from app.auth.constants import (
+    ANONYMOUS,
+    READER,
+    Permission,
+)
+from app.auth.models import (
+    AccessNode,
+    Group,
+    GroupAccess,
+    Role,
+)
+from app.extensions import db
+
+
+def _later(monkeypatch, seconds: float):
+    now = monotonic()
+    monkeypatch.setattr(indexes, 'monotonic', lambda: now + seconds)
+
+
+def test_role_index_reloads_after_ttl(app, app_context, monkeypatch):
+    reader = Role.get_by_name(READER)
+    roles = Role.__table__
+    role_index = indexes.role_index
+    role_index.invalidate()
+
+    assert reader.id not in role_index.role_ids(Permission.DELETE_RECORD)
+
+    # Written by another worker: the hooks don't run in this one.
+    db.session.execute(update(roles).where(roles.c.id == reader.id)\
+            .values(permission_mask=reader.permission_mask
+                | Permission.DELETE_RECORD.bit))
+    
+    try:
+        assert reader.id not in role_index.role_ids(Permission.DELETE_RECORD)
+
+        _later(monkeypatch, app.config['ACL_ROLE_INDEX_TTL'] + 1)
+        assert reader.id in role_index.role_ids(Permission.DELETE_RECORD)
+    finally:
+        db.session.rollback()
+        role_index.invalidate()
+
+def test_public_node_index_reloads_after_ttl(app, app_context, monkeypatch):
+    node = AccessNode.get_by_full_name('base.site_pages')
+    anonymous = Group.get_by_name(ANONYMOUS)
+    public_node_index = indexes.public_node_index
+    public_node_index.invalidate()
+
+    assert node.id not in public_node_index.node_ids(Permission.READ_RECORD)
+
+    db.session.execute(insert(GroupAccess.__table__).values(uuid=uuid4(),
+            access_id=node.id, group_id=anonymous.id,
+            role_id=Role.get_by_name(READER).id))
+    
+    try:
+        assert node.id not in public_node_index.node_ids(
+                Permission.READ_RECORD)
+
+        _later(monkeypatch, app.config['ACL_PUBLIC_NODE_TTL'] + 1)
+        assert node.id in public_node_index.node_ids(Permission.READ_RECORD)
+    finally:
+        db.session.rollback()
+        public_node_index.invalidate()
+
+def test_access_node_registry_reloads_after_ttl(app, app_context, monkeypatch):
+    node = AccessNode.get_by_full_name('base.site_pages')
+    nodes = AccessNode.__table__
+    registry = indexes.access_node_registry
+    registry.invalidate()
+
+    assert registry.node_id('base.site_pages') == node.id
+
+    db.session.execute(update(nodes).where(nodes.c.id == node.id)\
+            .values(name='moved_pages', path='base.moved_pages'))
+    
+    try:
+        assert registry.node_id('base.site_pages') == node.id
+
+        _later(monkeypatch, app.config['ACL_NODE_REGISTRY_TTL'] + 1)
+        assert registry.node_id('base.site_pages') is None
+    finally:
+        db.session.rollback()
+        registry.invalidate()
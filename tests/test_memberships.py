@@ -0,0 +1,117 @@
+from uuid import uuid4
+
+import pytest
+
+from app.auth import effective
+from app.auth.constants import (
+    EDITOR,
+    Permission,
+)
+from app.auth.models import (
+    AccessNode,
+    Group,
+    GroupAccess,
+    Role,
+    User,
+)
+from app.base.models import BulletinPost
+from app.extensions import db
+
+
+def _can_edit(node_id: int, user_id: int, post_id: int) -> tuple:
+    """Returns whether the user may edit the access node and whether the
+    post is among the bulletin posts they may edit.
+    """
+
+    user = db.session.get(User, user_id)
+    query = BulletinPost.authorized_query(Permission.EDIT_RECORD, user=user)
+
+    return (db.session.get(AccessNode, node_id).has_user_permissions(user,
+                Permission.EDIT_RECORD),
+            query.filter(BulletinPost.id == post_id).count() == 1)
+
+def _set_member(user_id: int, group_id: int, member: bool):
+    user = db.session.get(User, user_id)
+    group = db.session.get(Group, group_id)
+
+    if member:
+        user.groups.append(group)
+    else:
+        user.groups.remove(group)
+
+
+@pytest.fixture(params=['exists', 'join', 'effective'])
+def engine(request, app):
+    previous = app.config['ACL_QUERY_ENGINE']
+    app.config['ACL_QUERY_ENGINE'] = request.param
+
+    if request.param == 'effective':
+        with app.app_context():
+            effective.rebuild(db.session.connection())
+            db.session.commit()
+
+    yield request.param
+
+    app.config['ACL_QUERY_ENGINE'] = previous
+
+@pytest.fixture(params=[False, True], ids=['local', 'shared'])
+def acl_app(request, app):
+    """The app, with or without a shared ACL cache."""
+
+    return request.getfixturevalue('shared_app') if request.param else app
+
+
+def test_membership_changes_reach_acl_checks(acl_app, engine):
+    app = acl_app
+
+    with app.app_context():
+        name = uuid4().hex
+        node = AccessNode.create_by_full_name(
+                f"{BulletinPost.access_node_full_name}.{name}")
+        user = User.create_instance(username=name,
+                email=f"{name}@example.com", password='password',
+                active=True)
+        group = Group(name=name)
+        post = BulletinPost(title=name, content=name, display=['content'],
+                access_node=node)
+        db.session.add_all([
+            group,
+            post,
+            GroupAccess(access=node, group=group,
+                    role=Role.get_by_name(EDITOR)),
+        ])
+        db.session.commit()
+        ids = node.id, user.id, post.id
+        user_id, group_id = user.id, group.id
+
+    # Across requests.
+    with app.test_request_context():
+        app.preprocess_request()
+        assert _can_edit(*ids) == (False, False)
+
+    with app.test_request_context():
+        app.preprocess_request()
+        _set_member(user_id, group_id, True)
+        db.session.commit()
+
+    with app.test_request_context():
+        app.preprocess_request()
+        assert _can_edit(*ids) == (True, True)
+
+    # Within a request.
+    with app.test_request_context():
+        app.preprocess_request()
+        assert _can_edit(*ids) == (True, True)
+
+        _set_member(user_id, group_id, False)
+        db.session.flush()
+
+        assert _can_edit(*ids) == (False, False)
+
+        db.session.commit()
+
+        assert _can_edit(*ids) == (False, False)
+
+    with app.test_request_context():
+        app.preprocess_request()
+        assert _can_edit(*ids) == (False, False)
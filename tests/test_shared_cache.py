@@ -0,0 +1,272 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Optional
+from uuid import uuid4
+
+from flask import Flask
+import pytest
+from redis import Redis
+
+from app.auth import shared_cache as shared_cache_module
+from app.auth.constants import (
+    EDITOR,
+    READER,
+    Permission,
+)
+from app.auth.models import (
+    AccessNode,
+    Group,
+    GroupAccess,
+    Role,
+    User,
+    UserAccess,
+)
+from app.auth.shared_cache import shared_cache
+from app.extensions import db
+from app.testing import (
+    count_statements,
+    create_test_app,
+)
+
+
+# The app of a worker process. An app can only be created once per process.
+_worker_app: Optional[Flask] = None
+
+
+def _start_worker(database_uri: str, socket_file: str):
+    global _worker_app
+    _worker_app = create_test_app(database_uri,
+            Redis(unix_socket_path=socket_file))
+
+def _create_grant(app: Optional[Flask] = None) -> tuple:
+    """Grants the Editor role on an access node to a new user and creates a
+    new group, and returns the ids of the node, the user and the group.
+    """
+
+    with (app or _worker_app).app_context():
+        node = AccessNode.get_by_full_name('base.site_pages')
+        name = uuid4().hex
+        user = User.create_instance(username=name,
+                email=f"{name}@example.com", password='password',
+                active=True)
+        group = Group(name=name)
+        db.session.add_all([
+            group,
+            UserAccess(access=node, user=user, role=Role.get_by_name(EDITOR)),
+        ])
+        db.session.commit()
+
+        return node.id, user.id, group.id
+
+def _can_edit(node_id: int, user_id: int, app: Optional[Flask] = None
+        ) -> tuple:
+    """Checks the grant in a new request, and returns the decision and
+    whether it was read from the database.
+    """
+
+    app = app or _worker_app
+
+    with app.test_request_context():
+        app.preprocess_request()
+        node = db.session.get(AccessNode, node_id)
+        user = db.session.get(User, user_id)
+
+        with count_statements(db.engine) as counter:
+            allowed = node.has_user_permissions(user, Permission.EDIT_RECORD)
+
+        return allowed, counter['statements'] > 0
+
+def _write_role(node, user, group):
+    Role.get_by_name(READER).description = uuid4().hex
+
+def _write_group(node, user, group):
+    group.description = uuid4().hex
+
+def _write_user_access(node, user, group):
+    db.session.delete(UserAccess.query.filter_by(access_id=node.id,
+            user_id=user.id).one())
+
+def _write_group_access(node, user, group):
+    db.session.add(GroupAccess(access=node, group=group,
+            role=Role.get_by_name(READER)))
+
+def _write_access_node(node, user, group):
+    AccessNode.create_by_full_name(f"{node.full_name}.{uuid4().hex}")
+
+def _write_membership(node, user, group):
+    user.groups.append(group)
+
+def _write(write_name: str, node_id: int, user_id: int, group_id: int):
+    with _worker_app.test_request_context():
+        _worker_app.preprocess_request()
+        globals()[write_name](db.session.get(AccessNode, node_id),
+                db.session.get(User, user_id),
+                db.session.get(Group, group_id))
+        db.session.commit()
+
+
+@pytest.fixture(scope='module')
+def workers(redis, tmp_path_factory):
+    """Two worker processes with their own app on the same database and
+    Redis server.
+    """
+
+    database_uri = 'sqlite:///' \
+            + str(tmp_path_factory.mktemp('db') / 'site.sqlite')
+    workers = []
+
+    for _ in range(2):
+        worker = ProcessPoolExecutor(max_workers=1,
+                mp_context=get_context('spawn'), initializer=_start_worker,
+                initargs=(database_uri, redis.socket_file))
+        # Started one after the other, as both prepare the database.
+        worker.submit(int).result()
+        workers.append(worker)
+
+    yield workers
+
+    for worker in workers:
+        worker.shutdown()
+
+@pytest.fixture
+def grant(workers, redis):
+    redis.flushdb()
+    return workers[0].submit(_create_grant).result()
+
+
+def _decisions(redis) -> list:
+    return redis.keys('acl:*:decisions:*')
+
+
+def test_decisions_are_shared_between_workers(workers, redis, grant):
+    node_id, user_id, _ = grant
+
+    assert workers[0].submit(_can_edit, node_id, user_id).result() \
+            == (True, True)
+    assert len(_decisions(redis)) == 1
+    assert workers[1].submit(_can_edit, node_id, user_id).result() \
+            == (True, False)
+
+@pytest.mark.parametrize('write_name, allowed', [
+    ('_write_role', True),
+    ('_write_group', True),
+    ('_write_user_access', False),
+    ('_write_group_access', True),
+    ('_write_access_node', True),
+    ('_write_membership', True),
+])
+def test_acl_writes_orphan_shared_decisions(workers, redis, grant,
+        write_name, allowed):
+    node_id, user_id, _ = grant
+
+    assert workers[1].submit(_can_edit, node_id, user_id).result() \
+            == (True, True)
+    assert workers[1].submit(_can_edit, node_id, user_id).result() \
+            == (True, False)
+
+    version = int(redis.get('acl:version') or 0)
+    workers[0].submit(_write, write_name, *grant).result()
+
+    assert int(redis.get('acl:version')) == version + 1
+
+    # The other worker computes the decision again.
+    assert workers[1].submit(_can_edit, node_id, user_id).result() \
+            == (allowed, True)
+
+def test_uncommitted_acl_changes_are_not_shared(shared_app, redis):
+    node_id, user_id, group_id = _create_grant(shared_app)
+
+    with shared_app.test_request_context():
+        shared_app.preprocess_request()
+        node = db.session.get(AccessNode, node_id)
+        user = db.session.get(User, user_id)
+        user.groups.append(db.session.get(Group, group_id))
+        db.session.flush()
+
+        assert db.session.info['acl_changed']
+        assert node.has_user_permissions(user, Permission.EDIT_RECORD)
+        assert _decisions(redis) == []
+
+        db.session.rollback()
+
+    assert _can_edit(node_id, user_id, shared_app) == (True, True)
+    assert len(_decisions(redis)) == 1
+
+def test_shared_decisions_are_ignored_after_acl_changes(shared_app, redis):
+    node_id, user_id, _ = _create_grant(shared_app)
+
+    assert _can_edit(node_id, user_id, shared_app) == (True, True)
+
+    with shared_app.test_request_context():
+        shared_app.preprocess_request()
+        node = db.session.get(AccessNode, node_id)
+        user = db.session.get(User, user_id)
+        _write_user_access(node, user, None)
+        db.session.flush()
+
+        assert not node.has_user_permissions(user, Permission.EDIT_RECORD)
+
+        db.session.rollback()
+
+    # The shared decision was neither used nor overwritten.
+    assert _can_edit(node_id, user_id, shared_app) == (True, False)
+
+def test_decisions_are_stored_under_the_version_of_their_request(
+        shared_app, redis):
+    node_id, user_id, _ = _create_grant(shared_app)
+
+    with shared_app.test_request_context():
+        shared_app.preprocess_request()
+        node = db.session.get(AccessNode, node_id)
+        user = db.session.get(User, user_id)
+        version = redis.get('acl:version')
+        # Another worker commits once the request has started, but the
+        # data of the request may predate it.
+        redis.incr('acl:version')
+
+        assert node.has_user_permissions(user, Permission.EDIT_RECORD)
+
+    assert [key.split(b':')[1] for key in _decisions(redis)] == [version]
+    assert _can_edit(node_id, user_id, shared_app) == (True, True)
+
+def test_requests_drop_indexes_of_older_versions(shared_app, redis,
+        monkeypatch):
+    dropped = []
+    monkeypatch.setattr(shared_cache_module, '_listeners',
+            [lambda: dropped.append(True)])
+
+    with shared_app.test_request_context():
+        shared_app.preprocess_request()
+
+    dropped.clear()
+    # Committed by another worker, before its message arrives.
+    redis.incr('acl:version')
+
+    with shared_app.test_request_context():
+        shared_app.preprocess_request()
+
+    assert dropped == [True]
+
+    with shared_app.test_request_context():
+        shared_app.preprocess_request()
+
+    assert dropped == [True]
+
+def test_unreachable_redis_falls_back_to_the_database(shared_app, redis,
+        monkeypatch):
+    node_id, user_id, _ = _create_grant(shared_app)
+    monkeypatch.setitem(shared_app.extensions, 'acl_shared_cache',
+            Redis(unix_socket_path=redis.socket_file + '.missing'))
+
+    assert _can_edit(node_id, user_id, shared_app) == (True, True)
+
+    with shared_app.app_context():
+        assert shared_cache.redis is None
+
+def test_missing_redis_falls_back_to_the_database(app):
+    node_id, user_id, _ = _create_grant(app)
+
+    with app.app_context():
+        assert shared_cache.redis is None
+
+    assert _can_edit(node_id, user_id, app) == (True, True)
@@ -27,11 +27,16 @@ else:
     redis_db = None
 
 
+# Note: The shared ACL cache only stores plain values and can use Redis even
+# though sessions can't.
+acl_redis = redis_db
+
 # Note: Use SQLAlchemy session type instead of Redis due to the database
 # (MySQL) not being thread-safe.
 redis_db = None
 
-flask_app = create_app(use_celery=False, session_redis=redis_db)
+flask_app = create_app(use_celery=False, session_redis=redis_db,
+        acl_redis=acl_redis)
 celery_app = flask_app.extensions.get('celery', None)
 
 # Note: